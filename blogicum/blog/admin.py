@@ -1,43 +1,275 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Post, Category, Location, Comment
+from . import moderation
+from .models import Post, Category, Location, Comment, DeletionJob
+from .reaper import soft_delete_post, soft_delete_user
+from .search import match_filter
+from .utils import LimitedCountPaginator
 
+User = get_user_model()
 
-class PostAdmin(admin.ModelAdmin):
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """Фильтр по внешнему ключу с автодополнением вместо полного списка."""
+
+    template = 'admin/blog/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = f'{self.field_name}__id__exact'
+        field = model._meta.get_field(self.field_name)
+        self.title = field.verbose_name
+        super().__init__(request, params, model, model_admin)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'widget': self.form_field.widget.render(
+                self.parameter_name, self.value()),
+            'params': [
+                (name, value) for name, value in changelist.params.items()
+                if name != self.parameter_name
+            ],
+            'reset_query_string': changelist.get_query_string(
+                remove=[self.parameter_name]),
+            'selected': self.value() is not None,
+        }
+
+
+class AuthorFilter(AutocompleteFilter):
+    field_name = 'author'
+
+
+class LocationFilter(AutocompleteFilter):
+    field_name = 'location'
+
+
+class PostFilter(AutocompleteFilter):
+    field_name = 'post'
+
+
+class FastChangeListMixin:
+    """Общие настройки списков для таблиц на миллионы строк."""
+
+    paginator = LimitedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, type) and issubclass(
+                    list_filter, AutocompleteFilter):
+                media += AutocompleteSelect(None, self.admin_site).media
+                break
+        return media
+
+
+class PublishActionsMixin:
+    """Массовые «опубликовать» и «снять с публикации».
+
+    Каждое действие — UPDATE по порциям id вместо сохранения строк
+    по одной через list_editable; кэши лент сбрасываются один раз.
+    """
+
+    actions = ('publish', 'unpublish')
+    set_published = None
+
+    def _set_published(self, request, queryset, published, message):
+        count = self.set_published(queryset, published)
+        self.message_user(request, f'{message}: {count}')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',))
+    def publish(self, request, queryset):
+        self._set_published(request, queryset, True, 'Опубликовано')
+
+    @admin.action(
+        description='Снять с публикации выбранные', permissions=('change',))
+    def unpublish(self, request, queryset):
+        self._set_published(request, queryset, False, 'Снято с публикации')
+
+
+class BackgroundDeletionMixin:
+    """Удаление из админки скрывает объект, а строки удаляет фоном.
+
+    Страница подтверждения не обходит каскад в Python, а лишь
+    перечисляет выбранные объекты.
+    """
+
+    soft_delete = None
+
+    def get_deleted_objects(self, objs, request):
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        deleted = [str(obj) for obj in objs]
+        model_count = {self.opts.verbose_name_plural: len(deleted)}
+        return deleted, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.soft_delete(obj)
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(), required=False,
+        label='Категория'
+    )
+
+
+class PostAdmin(PublishActionsMixin, BackgroundDeletionMixin,
+                FastChangeListMixin, admin.ModelAdmin):
     list_display = ('title', 'is_published', 'category',
                     'author', 'location', 'pub_date')
     list_editable = ('is_published',)
     list_display_links = ('title',)
-    search_fields = ('title', 'author')
-    list_filter = ('is_published', 'category', 'author', 'location')
+    list_select_related = ('category', 'author', 'location')
+    search_fields = ('title', 'author__username')
+    list_filter = ('is_published', 'category', AuthorFilter, LocationFilter)
+    autocomplete_fields = ('author', 'location')
+    action_form = PostActionForm
+    actions = (*PublishActionsMixin.actions, 'move_to_category',
+               'delete_with_comments')
+    set_published = staticmethod(moderation.set_posts_published)
+    soft_delete = staticmethod(soft_delete_post)
+
+    def get_actions(self, request):
+        # стандартное удаление проходит по каждому комментарию в Python
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Перенести в категорию', permissions=('change',))
+    def move_to_category(self, request, queryset):
+        field = self.action_form.base_fields['category']
+        try:
+            category = field.clean(request.POST.get('category'))
+        except ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR)
+            return
+        count = moderation.move_posts(queryset, category)
+        self.message_user(
+            request, f'Перенесено в «{category.title}»: {count}')
+
+    @admin.action(
+        description='Удалить выбранные вместе с комментариями',
+        permissions=('delete',)
+    )
+    def delete_with_comments(self, request, queryset):
+        count = moderation.delete_posts(queryset)
+        self.message_user(request, f'Удалено публикаций: {count}')
+
+    def get_search_results(self, request, queryset, search_term):
+        # заголовки ищутся по индексу FTS5, авторы — по уникальному индексу
+        # имени пользователя, вместо LIKE '%...%' по всей таблице
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            match_filter(search_term) | Q(author__username=search_term)
+        ), False
+
+
+class LatestPostsFormSet(forms.BaseInlineFormSet):
+
+    def get_queryset(self):
+        if not hasattr(self, '_latest'):
+            self._latest = super().get_queryset()[:PostInline.per_page]
+        return self._latest
 
 
 class PostInline(admin.TabularInline):
+    """Только последние публикации категории, остальные — в списке постов."""
+
     model = Post
-    extra = 1
+    formset = LatestPostsFormSet
+    per_page = 10
+    fields = ('title', 'author', 'pub_date', 'is_published')
+    ordering = ('-pub_date',)
+    show_change_link = True
+    verbose_name_plural = f'Последние {per_page} публикаций'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
 
-class CategoryAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ('title', 'is_published', 'slug',)
     list_editable = ('is_published',)
     list_display_links = ('title',)
     search_fields = ('title',)
     list_filter = ('is_published',)
+    readonly_fields = ('posts_link',)
     inlines = (PostInline,)
+    set_published = staticmethod(moderation.set_categories_published)
+
+    @admin.display(description='Публикации')
+    def posts_link(self, category):
+        if category.pk is None:
+            return '-'
+        url = reverse('admin:blog_post_changelist')
+        return format_html(
+            '<a href="{}?category__id__exact={}">Все публикации категории</a>',
+            url, category.pk
+        )
 
 
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ('name', 'is_published',)
     list_editable = ('is_published',)
     list_display_links = ('name',)
     search_fields = ('name',)
     list_filter = ('is_published',)
+    set_published = staticmethod(moderation.set_locations_published)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ('post', 'author', 'text', 'created_at',)
     list_display_links = ('author',)
-    list_filter = ('post', 'author',)
+    list_select_related = ('post', 'author')
+    list_filter = (PostFilter, AuthorFilter,)
 
     def has_change_permission(self, request, obj=None):
         return False
@@ -46,6 +278,25 @@ class CommentAdmin(admin.ModelAdmin):
         return False
 
 
+class BlogUserAdmin(BackgroundDeletionMixin, UserAdmin):
+    soft_delete = staticmethod(soft_delete_user)
+
+
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'kind', 'object_id', 'deleted_rows', 'created_at', 'finished_at')
+    list_filter = ('kind',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.unregister(User)
+admin.site.register(User, BlogUserAdmin)
+admin.site.register(DeletionJob, DeletionJobAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
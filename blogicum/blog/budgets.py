@@ -0,0 +1,94 @@
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+# Максимальное число SQL-запросов на один запрос к странице — с учётом
+# загрузки сессии и пользователя, но без запросов планировщика публикаций
+# и команд управления транзакциями.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:search': 5,
+    'blog:feed_rss': 1,
+    'blog:feed_atom': 1,
+    'blog:category_feed_rss': 2,
+    'blog:category_feed_atom': 2,
+    'blog:author_feed_rss': 2,
+    'blog:author_feed_atom': 2,
+    'blog:sitemap_index': 2,
+    'blog:sitemap_categories': 1,
+    'blog:sitemap_shard': 2,
+    'blog:post_detail': 4,
+    'blog:post_comments': 4,
+    'blog:category_posts': 5,
+    'blog:profile': 5,
+    'blog:edit_profile': 4,
+    'blog:create_post': 8,
+    'blog:edit_post': 9,
+    'blog:delete_post': 6,
+    'blog:add_comment': 7,
+    'blog:edit_comment': 6,
+    'blog:delete_comment': 6,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
+
+TRANSACTION_STATEMENTS = (
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def check_query_budget(view_name, queries):
+    queries = [
+        query for query in queries
+        if not query['sql'].startswith(TRANSACTION_STATEMENTS)
+    ]
+    budget = QUERY_BUDGETS.get(view_name)
+    if budget is not None and len(queries) > budget:
+        statements = '\n'.join(query['sql'] for query in queries)
+        raise QueryBudgetExceeded(
+            f'{view_name}: {len(queries)} SQL-запросов при бюджете '
+            f'{budget}:\n{statements}'
+        )
+
+
+@contextmanager
+def capture_queries():
+    """Собирает запросы ко всем базам, не открывая новых соединений."""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append({'sql': sql, 'alias': context['connection'].alias})
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record))
+        yield queries
+
+
+@contextmanager
+def query_budget(view_name):
+    """Проверяет в тестах, что блок укладывается в бюджет страницы."""
+    with capture_queries() as queries:
+        yield queries
+    check_query_budget(view_name, queries)
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET_ENFORCE:
+            return self.get_response(request)
+        with capture_queries() as queries:
+            response = self.get_response(request)
+        if request.resolver_match is not None:
+            check_query_budget(request.resolver_match.view_name, queries)
+        return response
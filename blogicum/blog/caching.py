@@ -0,0 +1,177 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .routers import reads_from_replica
+
+HEADER_HOLE = mark_safe('<!--header-hole-->')
+
+
+def generation_key(name):
+    return f'blog:generation:{name}'
+
+
+def get_generation(name):
+    key = generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        # время в наносекундах гарантирует, что после вытеснения ключа
+        # поколение не вернётся к уже использованному значению
+        generation = time.time_ns()
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_generation(name):
+    try:
+        return cache.incr(generation_key(name))
+    except ValueError:
+        return get_generation(name)
+
+
+def get_feed_generation():
+    return get_generation('feeds')
+
+
+def bump_feed_generation():
+    bump_generation('pages')
+    return bump_generation('feeds')
+
+
+def get_feed_count(feed_key, queryset):
+    key = f'blog:feed-count:{get_feed_generation()}:{feed_key}'
+    count = cache.get(key)
+    if count is None:
+        queryset = queryset.order_by()
+        if settings.FEED_COUNT_ESTIMATE:
+            queryset = queryset[:settings.FEED_COUNT_ESTIMATE_LIMIT]
+        count = queryset.count()
+        cache.set(key, count, settings.FEED_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def version_key(model_name, pk):
+    return f'blog:version:{model_name}:{pk}'
+
+
+def bump_version(model_name, pk):
+    key = version_key(model_name, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_versions(model_name, pks):
+    """Сбрасывает версии многих объектов одной записью в кэш."""
+    version = time.time_ns()
+    cache.set_many(
+        {version_key(model_name, pk): version for pk in pks}, None)
+
+
+def invalidate_card(model_name, pk):
+    bump_version(model_name, pk)
+    bump_generation('pages')
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def body_version_keys(post):
+    keys = [
+        version_key('post', post.pk),
+        version_key('user', post.author_id),
+    ]
+    if post.category_id:
+        keys.append(version_key('category', post.category_id))
+    if post.location_id:
+        keys.append(version_key('location', post.location_id))
+    return keys
+
+
+def card_version_keys(post):
+    # в карточке, в отличие от тела статьи, выводится число комментариев
+    return [*body_version_keys(post), version_key('comments', post.pk)]
+
+
+def _set_versions(posts, attribute, get_keys):
+    if reads_from_replica():
+        # без версии шаблон рендерит фрагмент, не сохраняя его в кэш
+        for post in posts:
+            setattr(post, attribute, None)
+        return posts
+    keys_by_post = [(post, get_keys(post)) for post in posts]
+    versions = get_versions(
+        [key for _, keys in keys_by_post for key in keys])
+    for post, keys in keys_by_post:
+        setattr(post, attribute, '.'.join(
+            str(versions[key]) for key in keys))
+    return posts
+
+
+def set_card_versions(posts):
+    """Проставляет post.card_version — часть ключа кэша карточки."""
+    return _set_versions(posts, 'card_version', card_version_keys)
+
+
+def set_body_version(post):
+    """Проставляет post.body_version — часть ключа кэша тела статьи."""
+    return _set_versions([post], 'body_version', body_version_keys)[0]
+
+
+def fill_header_hole(request, content):
+    header = render_to_string('includes/header.html', request=request)
+    return content.replace(HEADER_HOLE.encode(), header.encode(), 1)
+
+
+def cache_anonymous_page(view):
+    """Кэширует страницу для анонимных читателей.
+
+    Шапка сайта вырезается из сохранённой страницы и рендерится заново
+    на каждый запрос. Ключ включает поколение страниц, поэтому любое
+    изменение публикаций делает старые копии недоступными; последняя
+    копия хранится отдельно и отдаётся, если база данных занята.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'blog:page:{get_generation("pages")}:{path}'
+        stale_key = f'blog:page-stale:{path}'
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(fill_header_hole(request, content))
+        request.header_hole = HEADER_HOLE
+        try:
+            response = view(request, *args, **kwargs)
+        except OperationalError:
+            content = cache.get(stale_key)
+            if content is None:
+                raise
+            return HttpResponse(fill_header_hole(request, content))
+        if response.status_code == 200:
+            # страница с отстающей реплики не должна попасть в кэш
+            # под новым поколением
+            if not reads_from_replica():
+                cache.set(key, response.content,
+                          settings.ANONYMOUS_PAGE_CACHE_TIMEOUT)
+                cache.set(stale_key, response.content,
+                          settings.ANONYMOUS_PAGE_STALE_TIMEOUT)
+            response.content = fill_header_hole(request, response.content)
+        return response
+    return wrapper
@@ -0,0 +1,60 @@
+import hashlib
+
+from .caching import get_generation
+from .models import Post, Visibility
+
+
+def make_etag(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def feed_etag(request, *args, **kwargs):
+    """ETag ленты: поколение кэша страниц меняют все сигналы записей.
+
+    Категория и автор ленты входят в путь и в базе не проверяются: их
+    скрытие тоже сдвигает поколение, а ETag не должен мешать отдаче
+    страницы из кэша, когда база занята.
+    """
+    return make_etag(
+        get_generation('pages'), request.user.pk, request.get_full_path())
+
+
+def get_reader_post(request, post_id):
+    """Пост для страницы поста одной выборкой, общей с её валидаторами.
+
+    Для поста, который читатель не увидит, возвращает None — тогда
+    представление ответит 404.
+    """
+    if not hasattr(request, '_reader_post'):
+        post = Post.objects.select_related(
+            'category', 'author', 'location').filter(pk=post_id).first()
+        if post is not None and post.author != request.user and (
+                post.visibility != Visibility.VISIBLE
+                or not post.author.is_active):
+            post = None
+        request._reader_post = post
+    return request._reader_post
+
+
+def post_timestamps(post):
+    return [
+        obj.updated_at for obj in (post, post.category, post.location)
+        if obj is not None
+    ]
+
+
+def post_etag(request, post_id):
+    post = get_reader_post(request, post_id)
+    if post is None:
+        return None
+    return make_etag(
+        *post_timestamps(post), post.author.username,
+        request.user.pk, request.get_full_path()
+    )
+
+
+def post_last_modified(request, post_id):
+    post = get_reader_post(request, post_id)
+    if post is None:
+        return None
+    return max(post_timestamps(post))
@@ -0,0 +1,162 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from .caching import get_generation
+from .conditional import make_etag
+from .models import Category
+from .views import get_base_queryset
+
+User = get_user_model()
+
+ITEM_FIELDS = (
+    'id', 'title', 'text', 'pub_date', 'updated_at',
+    'author__username', 'category__title',
+)
+
+
+def feed_generation_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:syndication:{get_generation("pages")}:{path}'
+
+
+def syndication_etag(request, *args, **kwargs):
+    # лента одинакова для всех читателей, пользователь в ключ не входит
+    return make_etag(feed_generation_key(request))
+
+
+def cached_feed(feed):
+    """Кэширует готовый XML ленты до следующего изменения публикаций."""
+    @condition(etag_func=syndication_etag)
+    def view(request, *args, **kwargs):
+        key = feed_generation_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            return HttpResponse(content, headers=headers)
+        response = feed(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {
+                name: response[name]
+                for name in ('Content-Type', 'Last-Modified')
+                if response.has_header(name)
+            }
+            cache.set(
+                key, (response.content, headers),
+                settings.SYNDICATION_CACHE_TIMEOUT
+            )
+        return response
+    return view
+
+
+class LatestPostsFeed(Feed):
+    title = 'Блогикум — новые публикации'
+    description = 'Последние публикации всех авторов.'
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def get_queryset(self, obj):
+        return get_base_queryset()
+
+    def items(self, obj):
+        # только нужные колонки, без моделей и связанных объектов
+        return self.get_queryset(obj).order_by('-pub_date').values(
+            *ITEM_FIELDS)[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return Truncator(item['text']).words(settings.SYNDICATION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'post_id': item['id']})
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_updateddate(self, item):
+        return item['updated_at']
+
+    def item_author_name(self, item):
+        return item['author__username']
+
+    def item_categories(self, item):
+        return [item['category__title']] if item['category__title'] else []
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category.objects.only('title', 'description', 'slug'),
+            slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум — {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+    def get_queryset(self, category):
+        return get_base_queryset().filter(category=category)
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(
+            User.objects.only('username'), username=username, is_active=True)
+
+    def title(self, author):
+        return f'Блогикум — публикации @{author.username}'
+
+    def description(self, author):
+        return f'Последние публикации автора @{author.username}.'
+
+    def link(self, author):
+        return reverse('blog:profile', args=[author.username])
+
+    def get_queryset(self, author):
+        return get_base_queryset().filter(author=author)
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
+
+
+latest_rss = cached_feed(LatestPostsFeed())
+latest_atom = cached_feed(LatestPostsAtomFeed())
+category_rss = cached_feed(CategoryPostsFeed())
+category_atom = cached_feed(CategoryPostsAtomFeed())
+author_rss = cached_feed(AuthorPostsFeed())
+author_atom = cached_feed(AuthorPostsAtomFeed())
@@ -0,0 +1,109 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps
+
+from .caching import invalidate_card
+
+# имя варианта: (наибольшая ширина, формат)
+RENDITIONS = {
+    'card': (640, 'JPEG'),
+    'card_webp': (640, 'WEBP'),
+    'detail': (1280, 'JPEG'),
+    'detail_webp': (1280, 'WEBP'),
+}
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+RENDITIONS_DIR = 'renditions'
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_name(source, name):
+    path = PurePosixPath(source)
+    extension = EXTENSIONS[RENDITIONS[name][1]]
+    return str(
+        path.parent / RENDITIONS_DIR / f'{path.stem}_{name}.{extension}')
+
+
+def make_renditions(source, storage=default_storage):
+    """Сохраняет уменьшенные копии изображения и возвращает image_meta."""
+    with storage.open(source) as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original = original.convert('RGB')
+    renditions = {}
+    for name, (width, image_format) in RENDITIONS.items():
+        image = original.copy()
+        image.thumbnail((width, width * 2), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(
+            buffer, image_format,
+            quality=settings.THUMBNAIL_QUALITY, optimize=True
+        )
+        path = rendition_name(source, name)
+        storage.delete(path)
+        storage.save(path, ContentFile(buffer.getvalue()))
+        renditions[name] = {
+            'path': path, 'width': image.width, 'height': image.height}
+    return {'source': source, 'renditions': renditions}
+
+
+def needs_renditions(post):
+    return bool(post.image) and (
+        post.image_meta.get('source') != post.image.name)
+
+
+def process_post(pk, force=False):
+    from .models import Post
+
+    post = Post.objects.filter(pk=pk).only('image', 'image_meta').first()
+    if post is None or not (
+            needs_renditions(post) or force and post.image):
+        return False
+    meta = {
+        **post.image_meta,
+        **make_renditions(post.image.name, post.image.storage),
+    }
+    # изображение могли заменить, пока готовились копии
+    updated = Post.objects.filter(pk=pk, image=post.image.name).update(
+        image_meta=meta)
+    if updated:
+        invalidate_card('post', pk)
+    return bool(updated)
+
+
+def process_in_worker(pk, force=False):
+    try:
+        return process_post(pk, force)
+    except OSError:
+        logger.exception('Не удалось уменьшить изображение поста %s', pk)
+        return False
+    finally:
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails'
+            )
+        return _executor
+
+
+def schedule_renditions(pk):
+    """Отдаёт пост фоновому пулу; без пула копии готовит только команда."""
+    if settings.THUMBNAIL_WORKERS:
+        return get_executor().submit(process_in_worker, pk)
+    return None
@@ -0,0 +1,53 @@
+from django.core.files.images import get_image_dimensions
+from django.core.management.base import BaseCommand
+
+from blog.caching import invalidate_card
+from blog.models import Post
+from blog.storage import file_sha256, hashed_name
+
+
+class Command(BaseCommand):
+    help = ('Заполняет SHA-256 и размеры изображений существующих публикаций '
+            'и переносит файлы под имена по хэшу. Старые файлы удалит '
+            'cleanup_media_orphans.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        storage = Post._meta.get_field('image').storage
+        last_id, updated, missing = 0, 0, 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_id, image_hash='')
+                .exclude(image='').order_by('pk')
+                .only('image', 'image_meta')[:chunk_size]
+            )
+            if not posts:
+                break
+            for post in posts:
+                old_name = post.image.name
+                if not storage.exists(old_name):
+                    missing += 1
+                    continue
+                with storage.open(old_name) as file:
+                    digest = file_sha256(file)
+                    width, height = get_image_dimensions(file)
+                    name = storage.save(hashed_name(digest, old_name), file)
+                # копии лежат рядом со старым файлом: их пересоздаст
+                # build_image_renditions в каталоге нового
+                meta = {'width': width, 'height': height}
+                # update() не трогает поля, которые могли поменяться
+                # в админке за время работы команды
+                if Post.objects.filter(pk=post.pk, image=old_name).update(
+                        image=name, image_hash=digest, image_meta=meta):
+                    invalidate_card('post', post.pk)
+                    updated += 1
+            last_id = posts[-1].pk
+            self.stdout.write(f'Обработано публикаций: {updated}')
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'Файлы не найдены у публикаций: {missing}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Хэши изображений заполнены: {updated}'))
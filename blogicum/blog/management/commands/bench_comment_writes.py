@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+BENCH_USERNAME = 'bench_writer'
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест: потоки пишут комментарии через '
+            'CreateComment, пока другие потоки читают главную страницу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+
+    def get_post(self):
+        """Автор и пост бенчмарка; созданное им запоминается в created."""
+        self.created = []
+        user, created = get_user_model().objects.get_or_create(
+            username=BENCH_USERNAME)
+        if created:
+            self.created.append(user)
+        category, created = Category.objects.get_or_create(
+            slug='bench', defaults={'title': 'Бенчмарк', 'description': ''})
+        if created:
+            self.created.append(category)
+        post, created = Post.objects.get_or_create(
+            title='Бенчмарк записи комментариев', author=user,
+            defaults={'text': '', 'pub_date': timezone.now(),
+                      'category': category})
+        if created:
+            self.created.append(post)
+        return user, post
+
+    def clean_up(self, user, post):
+        Comment.objects.filter(post=post, author=user).delete()
+        for obj in reversed(self.created):
+            obj.delete()
+
+    def run_worker(self, stats, deadline, request, user=None):
+        client = Client(HTTP_HOST='localhost')
+        if user is not None:
+            client.force_login(user)
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    status = request(client)
+                except Exception as error:
+                    status = type(error).__name__
+                stats[status] += 1
+        finally:
+            connection.close()
+
+    # бенчмарк меряет пропускную способность записи, а не лимиты частоты
+    @override_settings(RATE_LIMIT_ENABLE=False)
+    def handle(self, *args, **options):
+        user, post = self.get_post()
+        try:
+            self.run(user, post, options)
+        finally:
+            self.clean_up(user, post)
+
+    def run(self, user, post, options):
+        url = f'/posts/{post.pk}/comment/'
+        writes, reads = Counter(), Counter()
+
+        def write(client):
+            return client.post(url, {'text': 'bench'}).status_code
+
+        def read(client):
+            return client.get('/').status_code
+
+        deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.run_worker,
+                args=(writes, deadline, write, user))
+            for _ in range(options['writers'])
+        ] + [
+            threading.Thread(
+                target=self.run_worker, args=(reads, deadline, read))
+            for _ in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        seconds = options['seconds']
+        self.stdout.write(
+            f'Записи: {writes[302] / seconds:.1f}/с, '
+            f'ошибки записи: {sum(writes.values()) - writes[302]} '
+            f'{dict(writes)}')
+        self.stdout.write(
+            f'Чтения: {reads[200] / seconds:.1f}/с, '
+            f'ошибки чтения: {sum(reads.values()) - reads[200]}')
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.images import process_in_worker
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Готовит уменьшенные копии изображений существующих публикаций '
+            'в несколько потоков.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=max(settings.THUMBNAIL_WORKERS, 1))
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и у уже обработанных публикаций.')
+
+    def handle(self, *args, **options):
+        chunk_size, force = options['chunk_size'], options['force']
+        last_id, processed = 0, 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                ids = list(
+                    Post.objects.filter(pk__gt=last_id).exclude(image='')
+                    .order_by('pk').values_list('pk', flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                processed += sum(executor.map(
+                    process_in_worker, ids, [force] * len(ids)))
+                last_id = ids[-1]
+                self.stdout.write(f'Обработано публикаций: {processed}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Уменьшенные копии готовы: {processed}'))
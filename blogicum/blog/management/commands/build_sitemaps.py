@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import SECTIONS, shard_count, shard_path, write_shard
+
+
+class Command(BaseCommand):
+    help = ('Заранее записывает на диск закрытые шарды карты сайта, '
+            'чтобы запросы поисковых роботов не собирали их из базы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перезаписать и уже готовые файлы шардов.')
+
+    def handle(self, *args, **options):
+        written = 0
+        for section in SECTIONS:
+            # последний шард ещё пополняется — его собирает представление
+            for shard in range(shard_count(section) - 1):
+                if options['force'] or not shard_path(
+                        section, shard).exists():
+                    write_shard(section, shard)
+                    written += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано шардов карты сайта: {written}'))
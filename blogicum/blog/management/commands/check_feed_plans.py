@@ -0,0 +1,54 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.models import Post, Visibility
+from blog.views import get_base_queryset
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN QUERY PLAN для запросов лент и завершается '
+            'ошибкой, если какой-либо из них читает таблицу целиком '
+            'или сортирует её во временном B-дереве.')
+
+    def get_feeds(self):
+        return {
+            'index': get_base_queryset(),
+            'category_posts': get_base_queryset().filter(category_id=0),
+            'profile (автор)': Post.objects.filter(author_id=0),
+            'profile (гость)': Post.objects.filter(
+                author_id=0, visibility=Visibility.VISIBLE),
+        }
+
+    def explain(self, queryset):
+        queryset = queryset.order_by('-pub_date')[:settings.PAGE_ELEM + 1]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'Проверка планов поддерживается только для SQLite.')
+        failed = []
+        for name, queryset in self.get_feeds().items():
+            plan = self.explain(queryset)
+            problems = [
+                step for step in plan
+                if FULL_SCAN.match(step) or step == TEMP_SORT
+            ]
+            style = self.style.ERROR if problems else self.style.SUCCESS
+            self.stdout.write(style(name))
+            for step in plan:
+                self.stdout.write(f'    {step}')
+            if problems:
+                failed.append(name)
+        if failed:
+            raise CommandError(
+                'Запросы без подходящего индекса: ' + ', '.join(failed))
@@ -0,0 +1,106 @@
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.storage import IMAGES_DIR
+
+SHARD_DIR = re.compile(
+    rf'^{IMAGES_DIR}/([0-9a-f]{{2}})/([0-9a-f]{{2}})(/renditions)?$')
+
+
+def referenced_paths(rows):
+    for image, meta in rows:
+        yield image
+        if meta.get('source') == image:
+            for rendition in meta.get('renditions', {}).values():
+                yield rendition['path']
+
+
+class Command(BaseCommand):
+    help = ('Удаляет или переносит в карантин файлы изображений, на которые '
+            'не ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести список файлов-сирот.')
+        parser.add_argument(
+            '--quarantine', metavar='DIR',
+            help='Переносить сирот в этот каталог вместо удаления.')
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.storage = Post._meta.get_field('image').storage
+        media_root = Path(self.storage.path(''))
+        legacy = None
+        orphans, total_size = 0, 0
+        for dirpath, dirnames, filenames in os.walk(
+                self.storage.path(IMAGES_DIR)):
+            dirnames.sort()
+            if not filenames:
+                continue
+            directory = Path(dirpath).relative_to(media_root).as_posix()
+            shard = SHARD_DIR.match(directory)
+            if shard:
+                referenced = self.shard_references(shard[1] + shard[2])
+            else:
+                if legacy is None:
+                    legacy = self.legacy_references()
+                referenced = legacy
+            for filename in sorted(filenames):
+                name = f'{directory}/{filename}'
+                path = Path(dirpath) / filename
+                stat = path.stat()
+                if (name in referenced
+                        or time.time() - stat.st_mtime < options['min_age']):
+                    continue
+                orphans += 1
+                total_size += stat.st_size
+                self.handle_orphan(name, path)
+        verb = 'Найдено' if options['dry_run'] else 'Обработано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов-сирот: {orphans}, {total_size} байт'))
+
+    def shard_references(self, prefix):
+        # имена файлов в каталоге ab/cd начинаются с хэша abcd…
+        rows = Post.objects.filter(
+            image_hash__gte=prefix, image_hash__lt=prefix + 'g'
+        ).values_list('image', 'image_meta')
+        return set(referenced_paths(rows.iterator()))
+
+    def legacy_references(self):
+        referenced, last_id = set(), 0
+        while True:
+            rows = list(
+                Post.objects.filter(pk__gt=last_id, image_hash='')
+                .exclude(image='').order_by('pk')
+                .values_list('pk', 'image', 'image_meta')
+                [:self.options['chunk_size']]
+            )
+            if not rows:
+                return referenced
+            referenced.update(referenced_paths(
+                (image, meta) for _, image, meta in rows))
+            last_id = rows[-1][0]
+
+    def handle_orphan(self, name, path):
+        quarantine = self.options['quarantine']
+        if self.options['dry_run']:
+            self.stdout.write(f'Сирота: {name}')
+        elif quarantine:
+            target = Path(quarantine) / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(path, target)
+            self.stdout.write(f'В карантине: {name}')
+        else:
+            self.storage.delete(name)
+            self.stdout.write(f'Удалён: {name}')
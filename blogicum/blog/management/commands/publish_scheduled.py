@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduling import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Открывает отложенные публикации. Без --once работает '
+            'постоянно и просыпается ко времени ближайшей публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Максимальная пауза, чтобы заметить новые отложенные посты.')
+
+    def handle(self, *args, **options):
+        while True:
+            published, next_at = publish_due_posts()
+            if published:
+                self.stdout.write(f'Открыто публикаций: {published}')
+            if options['once']:
+                return
+            delay = options['max_sleep']
+            if next_at is not None:
+                delay = min(
+                    delay, (next_at - timezone.now()).total_seconds())
+            time.sleep(max(delay, 0))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import DeletionJob
+from blog.reaper import reap
+
+
+class Command(BaseCommand):
+    help = ('Доводит до конца фоновые удаления постов и пользователей, '
+            'которые не завершил фоновый поток.')
+
+    def handle(self, *args, **options):
+        jobs = DeletionJob.objects.filter(finished_at__isnull=True)
+        finished = 0
+        for job_pk in jobs.values_list('pk', flat=True):
+            finished += reap(job_pk)
+            job = DeletionJob.objects.get(pk=job_pk)
+            self.stdout.write(f'{job}: удалено строк {job.deleted_rows}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Завершено удалений: {finished}'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Post, Comment
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count порциями по id.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(total=Count('pk')).values('total')
+        last_id, updated = 0, 0
+        while True:
+            ids = list(
+                Post.objects.filter(pk__gt=last_id).order_by('pk').values_list(
+                    'pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += Post.objects.filter(
+                    pk__gte=ids[0], pk__lte=ids[-1]
+                ).update(comment_count=Coalesce(Subquery(counts), 0))
+            last_id = ids[-1]
+            self.stdout.write(f'Обработано публикаций: {updated}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики комментариев пересчитаны: {updated}'))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.models import Post
+from blog.search import FTS_TABLE, fts_enabled, index_posts
+from blog.sqlite import serialized_write
+
+
+def replace_range(first_id, last_id, rows):
+    """Заменяет строки индекса с rowid в (first_id, last_id] на rows.
+
+    Поиск всё время видит либо старую, либо новую порцию индекса.
+    """
+    with connection.cursor() as cursor:
+        if last_id is None:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid > %s', [first_id])
+        else:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid > %s AND rowid <= %s',
+                [first_id, last_id]
+            )
+        index_posts(cursor, rows)
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает полнотекстовый индекс публикаций порциями по id, '
+            'не опустошая его целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        chunk_size = options['chunk_size']
+        last_id, indexed = 0, 0
+        while True:
+            rows = list(
+                Post.objects.filter(pk__gt=last_id).order_by('pk').values_list(
+                    'pk', 'title', 'text')[:chunk_size]
+            )
+            if not rows:
+                break
+            serialized_write(replace_range, last_id, rows[-1][0], rows)
+            last_id = rows[-1][0]
+            indexed += len(rows)
+            self.stdout.write(f'Проиндексировано публикаций: {indexed}')
+        # строки удалённых публикаций с id больше последнего
+        serialized_write(replace_range, last_id, None, [])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс поиска перестроен: {indexed}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.caching import bump_feed_generation
+from blog.models import Post
+from blog.moderation import pk_chunks
+from blog.scheduling import forget_next_publication, refresh_visibility
+from blog.sitemaps import forget_section
+from blog.sqlite import serialized_write
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает видимость публикаций порциями по id — например, '
+            'после loaddata, который не вызывает Post.save().')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        processed = 0
+        for pks in pk_chunks(Post.objects.all(), options['chunk_size']):
+            serialized_write(
+                refresh_visibility, Post.objects.filter(pk__in=pks), now)
+            processed += len(pks)
+            self.stdout.write(f'Обработано публикаций: {processed}')
+        forget_section('posts')
+        forget_next_publication()
+        bump_feed_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Видимость публикаций пересчитана: {processed}'))
@@ -0,0 +1,16 @@
+from .scheduling import publish_due_posts_if_needed
+
+
+class PublicationSchedulerMiddleware:
+    """Открывает наступившие отложенные посты до обработки запроса.
+
+    Проверка стоит одно чтение из кэша; запрос к базе выполняется, только
+    когда наступило время ближайшей отложенной публикации.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        publish_due_posts_if_needed()
+        return self.get_response(request)
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:25
+
+from django.db import migrations, models
+from django.utils import timezone
+
+HIDDEN, SCHEDULED, VISIBLE = 0, 1, 2
+
+
+def fill_visibility(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    shown = Post.objects.filter(
+        is_published=True, category__is_published=True)
+    now = timezone.now()
+    Post.objects.filter(
+        pk__in=shown.filter(pub_date__lte=now).values('pk')
+    ).update(visibility=VISIBLE)
+    Post.objects.filter(
+        pk__in=shown.filter(pub_date__gt=now).values('pk')
+    ).update(visibility=SCHEDULED)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='visibility',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Скрыта'), (1, 'Отложена'), (2, 'Видна в лентах')], default=0, editable=False, help_text='Вычисляется из флагов публикации поста и категории; отложенные посты открывает планировщик.', verbose_name='Видимость'),
+        ),
+        migrations.RunPython(fill_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['visibility', 'pub_date'], name='post_visibility_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'visibility', 'pub_date'], name='post_category_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'visibility', 'pub_date'], name='post_author_visible_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_rate_limit_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Публикация'), ('user', 'Пользователь')], max_length=16, verbose_name='Что удаляется')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id объекта')),
+                ('deleted_rows', models.PositiveIntegerField(default=0, verbose_name='Удалено строк')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'фоновое удаление',
+                'verbose_name_plural': 'Фоновые удаления',
+                'ordering': ('created_at',),
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='visibility',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Скрыта'), (1, 'Отложена'), (2, 'Видна в лентах'), (3, 'Удалена')], default=0, editable=False, help_text='Вычисляется из флагов публикации поста и категории; отложенные посты открывает планировщик, удалённые убирает фоновая очистка.', verbose_name='Видимость'),
+        ),
+    ]
@@ -1,40 +1,59 @@
-from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.shortcuts import redirect
 
 from .models import Post, Comment
+from .sqlite import serialized_write
 
 
-class PostActionMixin:
+class SerializedWriteMixin:
+
+    def form_valid(self, form):
+        return serialized_write(super().form_valid, form)
+
+
+class SingleObjectOnceMixin:
+    """Выбирает объект один раз на запрос.
+
+    Его используют и проверка прав в dispatch, и форма, и адрес
+    перенаправления.
+    """
+
+    _object = None
+
+    def get_object(self, queryset=None):
+        if self._object is None:
+            self._object = super().get_object(queryset)
+        return self._object
+
+
+class PostActionMixin(SingleObjectOnceMixin):
     model = Post
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.select_related('author', 'category', 'location')
+
     def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=kwargs.get('post_id'))
-        if post.author != request.user:
+        post = self.get_object()
+        if post.author_id != request.user.pk:
             return redirect('blog:post_detail', post.id)
         return super().dispatch(request, *args, **kwargs)
 
 
-class CommentActionMixin:
+class CommentActionMixin(SingleObjectOnceMixin):
     model = Comment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
+    def get_queryset(self):
+        return Comment.objects.filter(
+            post_id=self.kwargs.get('post_id')).select_related('author')
+
     def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=kwargs.get('post_id'))
-        comment = get_object_or_404(
-            Comment,
-            pk=kwargs.get('comment_id'),
-            post=post
-        )
-
-        if comment.author != request.user:
-            return redirect('blog:post_detail', post.pk)
+        comment = self.get_object()
+        if comment.author_id != request.user.pk:
+            return redirect('blog:post_detail', comment.post_id)
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
-        return reverse_lazy(
-            'blog:post_detail',
-            kwargs={'post_id': self.get_object().post.id}
-        )
+        return self.object.get_absolute_url()
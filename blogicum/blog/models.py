@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage, file_sha256, post_image_path
 
 User = get_user_model()
 
@@ -17,6 +20,10 @@ class BaseModel(models.Model):
         verbose_name='Добавлено',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True
+    )
 
     class Meta:
         abstract = True
@@ -58,6 +65,29 @@ class Category(BaseModel):
         verbose_name_plural = 'Категории'
 
 
+class Visibility(models.IntegerChoices):
+    HIDDEN = 0, 'Скрыта'
+    SCHEDULED = 1, 'Отложена'
+    VISIBLE = 2, 'Видна в лентах'
+    DELETED = 3, 'Удалена'
+
+
+class PostQuerySet(models.QuerySet):
+
+    def delete(self):
+        from .signals import deleting_posts
+
+        with deleting_posts():
+            return super().delete()
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Не показывает удалённые посты, которые ждут фоновой очистки."""
+
+    def get_queryset(self):
+        return super().get_queryset().exclude(visibility=Visibility.DELETED)
+
+
 class Post(BaseModel):
     title = models.CharField(
         verbose_name='Заголовок',
@@ -86,18 +116,114 @@ class Post(BaseModel):
         verbose_name='Категория', null=True
     )
     image = models.ImageField(
-        verbose_name='Изображение', blank=True, upload_to='post_images'
+        verbose_name='Изображение', blank=True,
+        upload_to=post_image_path, storage=ContentAddressedStorage()
+    )
+    image_hash = models.CharField(
+        verbose_name='SHA-256 изображения',
+        max_length=64, blank=True, db_index=True, editable=False
+    )
+    image_meta = models.JSONField(
+        verbose_name='Размеры и уменьшенные копии изображения',
+        default=dict, blank=True, editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
+    visibility = models.PositiveSmallIntegerField(
+        verbose_name='Видимость',
+        choices=Visibility.choices,
+        default=Visibility.HIDDEN,
+        editable=False,
+        help_text=('Вычисляется из флагов публикации поста и категории; '
+                   'отложенные посты открывает планировщик, удалённые '
+                   'убирает фоновая очистка.')
     )
 
+    objects = PostManager()
+    all_objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(
+                fields=('visibility', 'pub_date'),
+                name='post_visibility_idx'
+            ),
+            models.Index(
+                fields=('category', 'visibility', 'pub_date'),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('author', 'visibility', 'pub_date'),
+                name='post_author_visible_idx'
+            ),
+        )
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
+    def delete(self, *args, **kwargs):
+        from .signals import deleting_posts
+
+        with deleting_posts():
+            return super().delete(*args, **kwargs)
+
+    @property
+    def renditions(self):
+        if not self.image or (
+                self.image_meta.get('source') != self.image.name):
+            return {}
+        storage = self.image.storage
+        return {
+            name: {**rendition, 'url': storage.url(rendition['path'])}
+            for name, rendition in self.image_meta['renditions'].items()
+        }
+
+    def get_visibility(self, now=None):
+        # удалённый пост ждёт фоновой очистки и уже не возвращается
+        if self.visibility == Visibility.DELETED:
+            return Visibility.DELETED
+        if (not self.is_published or self.category is None
+                or not self.category.is_published):
+            return Visibility.HIDDEN
+        if self.pub_date > (now or timezone.now()):
+            return Visibility.SCHEDULED
+        return Visibility.VISIBLE
+
+    def read_image_details(self):
+        """Запоминает хэш и размеры нового файла, пока он ещё в памяти."""
+        if not self.image:
+            self.image_hash, self.image_meta = '', {}
+        elif not self.image._committed:
+            self.image_hash = file_sha256(self.image)
+            self.image_meta = {
+                'width': self.image.width, 'height': self.image.height}
+        else:
+            return set()
+        return {'image_hash', 'image_meta'}
+
+    def save(self, *args, **kwargs):
+        self.visibility = self.get_visibility()
+        changed = self.read_image_details()
+        if kwargs.get('update_fields') is not None:
+            update_fields = {
+                *kwargs['update_fields'], 'visibility', 'updated_at'}
+            if 'image' in update_fields:
+                update_fields |= changed
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -120,9 +246,62 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('created_at',), name='comment_created_idx'),
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_thread_idx'
+            ),
+        )
 
     def __str__(self):
         return f'comment from {self.author} id = {self.pk}'
 
     def get_absolute_url(self):
-        return reverse('blog:post_detail', kwargs={'post_id': self.post.pk})
+        from .utils import get_comments_paginator
+
+        url = reverse('blog:post_detail', kwargs={'post_id': self.post_id})
+        cursor = get_comments_paginator(self.post_id).cursor_for(self)
+        if cursor:
+            url += f'?comments={cursor}'
+        return f'{url}#comment_{self.pk}'
+
+
+class RateLimitCounter(models.Model):
+    key = models.CharField(
+        verbose_name='Ключ', max_length=MAX_TITLE_LENGTH, primary_key=True)
+    value = models.BigIntegerField(verbose_name='Значение', default=0)
+    expires_at = models.DateTimeField(verbose_name='Истекает')
+
+    class Meta:
+        verbose_name = 'Счётчик ограничения запросов'
+        verbose_name_plural = 'Счётчики ограничения запросов'
+
+    def __str__(self):
+        return self.key
+
+
+class DeletionJob(models.Model):
+    """Фоновое удаление поста или пользователя со всеми их строками."""
+
+    class Kind(models.TextChoices):
+        POST = 'post', 'Публикация'
+        USER = 'user', 'Пользователь'
+
+    kind = models.CharField(
+        verbose_name='Что удаляется', max_length=16, choices=Kind.choices)
+    object_id = models.PositiveIntegerField(verbose_name='id объекта')
+    deleted_rows = models.PositiveIntegerField(
+        verbose_name='Удалено строк', default=0)
+    created_at = models.DateTimeField(
+        verbose_name='Создано', auto_now_add=True)
+    finished_at = models.DateTimeField(
+        verbose_name='Завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'фоновое удаление'
+        verbose_name_plural = 'Фоновые удаления'
+        ordering = ('created_at',)
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id}'
@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .caching import bump_feed_generation, bump_generation, bump_versions
+from .models import Category, Comment, Location, Post, Visibility
+from .scheduling import (
+    forget_next_publication, release_case, visibility_case)
+from .search import remove_posts
+from .sitemaps import forget_section, forget_shards
+from .sqlite import serialized_write
+
+
+def pk_chunks(queryset, size=None):
+    """Списки id объектов выборки по size штук, по возрастанию id."""
+    size = size or settings.MODERATION_CHUNK_SIZE
+    queryset = queryset.order_by('pk')
+    last_pk = 0
+    while True:
+        pks = list(queryset.filter(pk__gt=last_pk).values_list(
+            'pk', flat=True)[:size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def _run_in_chunks(queryset, write):
+    """Выполняет write(pks) по порциям, каждую — отдельной транзакцией.
+
+    Возвращает id всех обработанных объектов.
+    """
+    done = []
+    for pks in pk_chunks(queryset):
+        serialized_write(write, pks)
+        done.extend(pks)
+    return done
+
+
+def set_posts_published(queryset, published):
+    now = timezone.now()
+
+    def write(pks):
+        posts = Post.objects.filter(pk__in=pks)
+        if not published:
+            posts.update(
+                is_published=False, visibility=Visibility.HIDDEN,
+                updated_at=now
+            )
+            return
+        # в UPDATE выражения видят старые значения колонок, поэтому
+        # видимость считается без старого is_published
+        posts.filter(category__is_published=True).update(
+            is_published=True, visibility=release_case(now), updated_at=now)
+        posts.exclude(category__is_published=True).update(
+            is_published=True, updated_at=now)
+
+    pks = _run_in_chunks(queryset, write)
+    if pks:
+        # карточка и тело статьи показывают отметку о снятии с публикации
+        bump_versions('post', pks)
+        forget_shards('posts', pks)
+        forget_next_publication()
+        bump_feed_generation()
+    return len(pks)
+
+
+def move_posts(queryset, category):
+    now = timezone.now()
+
+    def write(pks):
+        posts = Post.objects.filter(pk__in=pks)
+        if category.is_published:
+            posts.update(
+                category=category, visibility=visibility_case(now),
+                updated_at=now
+            )
+        else:
+            posts.update(
+                category=category, visibility=Visibility.HIDDEN,
+                updated_at=now
+            )
+
+    pks = _run_in_chunks(queryset, write)
+    if pks:
+        bump_versions('post', pks)
+        forget_shards('posts', pks)
+        forget_next_publication()
+        bump_feed_generation()
+    return len(pks)
+
+
+def delete_posts(queryset):
+    """Удаляет посты вместе с комментариями двумя DELETE на порцию.
+
+    Сигналы удаления не отправляются: индекс поиска, шарды карты сайта
+    и кэши лент обновляются здесь же, один раз на порцию или на всё
+    действие. Файлы изображений убирает команда cleanup_media_orphans.
+    """
+    def write(pks):
+        comments = Comment.objects.filter(post_id__in=pks)
+        comments._raw_delete(comments.db)
+        posts = Post.objects.filter(pk__in=pks)
+        posts._raw_delete(posts.db)
+        remove_posts(pks)
+
+    pks = _run_in_chunks(queryset, write)
+    if pks:
+        forget_shards('posts', pks)
+        forget_next_publication()
+        bump_feed_generation()
+    return len(pks)
+
+
+def set_categories_published(queryset, published):
+    now = timezone.now()
+
+    def write(pks):
+        Category.objects.filter(pk__in=pks).update(
+            is_published=published, updated_at=now)
+        posts = Post.objects.filter(category__in=pks)
+        if published:
+            posts.update(visibility=visibility_case(now))
+        else:
+            posts.update(visibility=Visibility.HIDDEN)
+
+    pks = _run_in_chunks(queryset, write)
+    if pks:
+        bump_versions('category', pks)
+        forget_section('posts')
+        forget_next_publication()
+        bump_feed_generation()
+    return len(pks)
+
+
+def set_locations_published(queryset, published):
+    now = timezone.now()
+
+    def write(pks):
+        Location.objects.filter(pk__in=pks).update(
+            is_published=published, updated_at=now)
+
+    pks = _run_in_chunks(queryset, write)
+    if pks:
+        # место влияет только на карточки, но не на состав лент
+        bump_versions('location', pks)
+        bump_generation('pages')
+    return len(pks)
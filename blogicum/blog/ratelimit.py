@@ -0,0 +1,201 @@
+import json
+import math
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.dispatch import receiver
+from django.shortcuts import render
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Хранилище счётчиков реализует один атомарный шаг
+# advance(key, now, delta, limit, timeout): new = max(value, now) + delta
+# сохраняется, только если new - now <= limit, и возвращается в любом
+# случае. Устаревшая запись хранит время меньше now, поэтому после
+# истечения timeout отсчёт сам начинается с текущего момента.
+
+
+class LocalCounterStore:
+    """Счётчики в памяти процесса: для одного процесса и тестов."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def advance(self, key, now, delta, limit, timeout):
+        expires_at = time.time() + timeout
+        with self._lock:
+            value = max(self._values.get(key, (now, 0))[0], now) + delta
+            if value - now <= limit:
+                self._values[key] = (value, expires_at)
+            return value
+
+
+class FileCounterStore:
+    """Счётчики в JSON-файле под блокировкой flock.
+
+    Годится для нескольких процессов на одной машине при отладке.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def advance(self, key, now, delta, limit, timeout):
+        import fcntl
+
+        current = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a+', encoding='utf-8') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+            content = file.read()
+            values = {
+                name: item for name, item in (
+                    json.loads(content) if content else {}).items()
+                if item[1] > current
+            }
+            value = max(values.get(key, (now, 0))[0], now) + delta
+            if value - now <= limit:
+                values[key] = (value, current + timeout)
+            file.seek(0)
+            file.truncate()
+            json.dump(values, file)
+            return value
+
+
+class DatabaseCounterStore:
+    """Счётчики в таблице RateLimitCounter: шаг — один UPDATE."""
+
+    def advance(self, key, now, delta, limit, timeout):
+        from .models import RateLimitCounter
+
+        expires_at = timezone.now() + timedelta(seconds=timeout)
+        counters = RateLimitCounter.objects.filter(key=key)
+
+        def update():
+            # max(value, now) + delta <= now + limit, записанное без max
+            return counters.filter(value__lte=now + limit - delta).update(
+                value=Greatest(F('value'), Value(now)) + delta,
+                expires_at=expires_at
+            )
+
+        with transaction.atomic():
+            while True:
+                if update():
+                    return counters.values_list('value', flat=True).get()
+                value = counters.values_list('value', flat=True).first()
+                if value is not None:
+                    return max(value, now) + delta
+                try:
+                    with transaction.atomic():
+                        RateLimitCounter.objects.create(
+                            key=key, value=now + delta,
+                            expires_at=expires_at)
+                    return now + delta
+                except IntegrityError:
+                    # строку только что создал параллельный запрос
+                    continue
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            store_class = import_string(settings.RATE_LIMIT_STORE)
+            _store = store_class(**settings.RATE_LIMIT_STORE_OPTIONS)
+        return _store
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    global _store
+    if setting.startswith('RATE_LIMIT_STORE'):
+        _store = None
+
+
+def bucket(requests, period, burst, now=None):
+    """Текущее время, шаг и ёмкость корзины в миллисекундах."""
+    interval = period * 1000 // requests
+    limit = burst * interval
+    timeout = math.ceil(limit / 1000) + 1
+    return int((now or time.time()) * 1000), interval, limit, timeout
+
+
+def consume(store, key, requests, period, burst, now=None):
+    """Забирает маркер из корзины key; возвращает, сколько секунд ждать.
+
+    Корзина на burst маркеров пополняется requests маркерами за period
+    секунд. Она хранится одним числом — теоретическим временем прихода
+    следующего запроса в миллисекундах (GCRA), и сдвигается одним
+    атомарным шагом хранилища.
+    """
+    now, interval, limit, timeout = bucket(requests, period, burst, now)
+    arrival = store.advance(key, now, interval, limit, timeout)
+    return max(arrival - now - limit, 0) / 1000
+
+
+def refund(store, key, requests, period, burst, now=None):
+    """Возвращает маркер запроса, отклонённого по другому ключу."""
+    now, interval, limit, timeout = bucket(requests, period, burst, now)
+    store.advance(key, now, -interval, limit, timeout)
+
+
+def client_keys(request):
+    keys = [f'ip:{request.META.get("REMOTE_ADDR", "")}']
+    if request.user.is_authenticated:
+        keys.insert(0, f'user:{request.user.pk}')
+    return keys
+
+
+def get_view_name(request):
+    try:
+        return resolve(request.path_info).view_name
+    except Resolver404:
+        return None
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту записей по правилам RATE_LIMITS.
+
+    Проверка идёт до остальных middleware с записью в базу и до
+    представления, поэтому отклонённый запрос ничего не пишет.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.RATE_LIMIT_ENABLE and request.method in WRITE_METHODS:
+            view_name = get_view_name(request)
+            policy = settings.RATE_LIMITS.get(view_name)
+            if policy is not None:
+                store = get_store()
+                taken = []
+                for client in client_keys(request):
+                    key = f'ratelimit:{view_name}:{client}'
+                    wait = consume(store, key, **policy)
+                    if wait:
+                        for key in taken:
+                            refund(store, key, **policy)
+                        return self.rate_limited(request, wait)
+                    taken.append(key)
+        return self.get_response(request)
+
+    def rate_limited(self, request, wait):
+        response = render(request, 'pages/429.html', status=429)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
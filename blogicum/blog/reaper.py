@@ -0,0 +1,177 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import bump_feed_generation, bump_generation, bump_versions
+from .models import Comment, DeletionJob, Post, Visibility
+from .moderation import pk_chunks
+from .scheduling import forget_next_publication
+from .search import remove_posts
+from .sitemaps import forget_shards
+from .sqlite import serialized_write
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def soft_delete_post(post):
+    """Скрывает пост сразу, а комментарии и саму строку удаляет фоном."""
+    post.visibility = Visibility.DELETED
+    post.save(update_fields=['visibility'])
+    job = DeletionJob.objects.create(
+        kind=DeletionJob.Kind.POST, object_id=post.pk)
+    transaction.on_commit(lambda: schedule_reaping(job.pk))
+    return job
+
+
+def soft_delete_user(user):
+    """Отключает пользователя; его посты скрывает фоновая задача.
+
+    До её запуска посты неактивного автора отсекают фильтры лент,
+    поэтому в запросе пишутся только две строки.
+    """
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    job = DeletionJob.objects.create(
+        kind=DeletionJob.Kind.USER, object_id=user.pk)
+    forget_shards('authors', [user.pk])
+    bump_feed_generation()
+    transaction.on_commit(lambda: schedule_reaping(job.pk))
+    return job
+
+
+def hide_posts(pks):
+    Post.objects.filter(pk__in=pks).update(
+        visibility=Visibility.DELETED, updated_at=timezone.now())
+    remove_posts(pks)
+    forget_shards('posts', pks)
+
+
+def recount_comments(post_ids):
+    # то же, что делают сигналы комментариев: счётчик, updated_at для
+    # условных GET и сброс кэшей страниц
+    count = Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post').annotate(count=Count('pk')).values('count')
+    Post.all_objects.filter(pk__in=post_ids).update(
+        comment_count=Coalesce(Subquery(count), 0),
+        updated_at=timezone.now()
+    )
+    bump_versions('comments', post_ids)
+    bump_generation('pages')
+
+
+def delete_comments(pks, recount=False):
+    # без сигналов: счётчики пересчитываются одним UPDATE на порцию
+    comments = Comment.objects.filter(pk__in=pks)
+    post_ids = set(
+        comments.values_list('post_id', flat=True)) if recount else ()
+    comments._raw_delete(comments.db)
+    if post_ids:
+        recount_comments(post_ids)
+
+
+def delete_posts(pks):
+    posts = Post.all_objects.filter(pk__in=pks)
+    posts._raw_delete(posts.db)
+    remove_posts(pks)
+
+
+def delete_in_batches(job, queryset, delete):
+    """Удаляет строки выборки порциями, отмечая прогресс в задаче."""
+    size = settings.REAPER_BATCH_SIZE
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        pks = list(queryset[:size])
+        if not pks:
+            return
+
+        def write():
+            delete(pks)
+            DeletionJob.objects.filter(pk=job.pk).update(
+                deleted_rows=F('deleted_rows') + len(pks))
+
+        serialized_write(write)
+
+
+def reap_post(job):
+    delete_in_batches(
+        job, Comment.objects.filter(post_id=job.object_id), delete_comments)
+    delete_in_batches(
+        job, Post.all_objects.filter(pk=job.object_id), delete_posts)
+
+
+def reap_user(job):
+    user_id = job.object_id
+    for pks in pk_chunks(Post.objects.filter(author_id=user_id)):
+        serialized_write(hide_posts, pks)
+    forget_next_publication()
+    bump_feed_generation()
+    # сначала комментарии к чужим постам — с пересчётом их счётчиков
+    delete_in_batches(
+        job, Comment.objects.filter(author_id=user_id),
+        lambda pks: delete_comments(pks, recount=True)
+    )
+    delete_in_batches(
+        job, Comment.objects.filter(post__author_id=user_id),
+        delete_comments
+    )
+    delete_in_batches(
+        job, Post.all_objects.filter(author_id=user_id), delete_posts)
+    # у пользователя не осталось публикаций и комментариев: каскад дешёвый
+    serialized_write(User.objects.filter(pk=user_id).delete)
+
+
+REAPERS = {
+    DeletionJob.Kind.POST: reap_post,
+    DeletionJob.Kind.USER: reap_user,
+}
+
+
+def reap(job_pk):
+    job = DeletionJob.objects.filter(
+        pk=job_pk, finished_at__isnull=True).first()
+    if job is None:
+        return False
+    REAPERS[job.kind](job)
+    DeletionJob.objects.filter(pk=job.pk).update(finished_at=timezone.now())
+    return True
+
+
+def reap_in_worker(job_pk):
+    try:
+        return reap(job_pk)
+    except Exception:
+        # задача останется незавершённой, её доделает reap_deletions
+        logger.exception('Не удалось завершить фоновое удаление %s', job_pk)
+        return False
+    finally:
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.REAPER_WORKERS,
+                thread_name_prefix='reaper'
+            )
+        return _executor
+
+
+def schedule_reaping(job_pk):
+    """Отдаёт задачу фоновому потоку; без него её выполнит команда."""
+    if settings.REAPER_WORKERS:
+        return get_executor().submit(reap_in_worker, job_pk)
+    return None
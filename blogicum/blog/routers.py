@@ -0,0 +1,88 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reads_from_replica():
+    """Идёт ли чтение текущего запроса с реплики.
+
+    Реплика может отставать, поэтому то, что прочитано с неё, не
+    кэшируется под версиями, которые сдвигает запись в основную базу.
+    """
+    return bool(settings.DATABASE_REPLICAS and _replica_reads.get()
+                and not _pinned.get())
+
+
+def read_from_replica(view):
+    """Разрешает читать данные представления с реплик."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Отправляет чтение из отмеченных представлений на реплики.
+
+    Все остальные запросы, включая любую запись, идут в основную базу.
+    Пока действует закрепление после записи, реплики не используются.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaStickinessMiddleware:
+    """Закрепляет чтение за основной базой после записи пользователя."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_until = request.COOKIES.get(PIN_COOKIE, '')
+        try:
+            pinned = float(pinned_until) > time.time()
+        except ValueError:
+            pinned = False
+        token = _pinned.set(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 500:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + sticky),
+                max_age=sticky, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,105 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Case, Min, Value, When
+from django.utils import timezone
+
+from .caching import bump_feed_generation
+from .models import Post, Visibility
+from .sitemaps import forget_shards
+from .sqlite import serialized_write
+
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+
+
+def release_case(now):
+    """Видимость опубликованного поста в опубликованной категории."""
+    return Case(
+        When(pub_date__gt=now, then=Value(Visibility.SCHEDULED)),
+        default=Value(Visibility.VISIBLE),
+    )
+
+
+def visibility_case(now):
+    return Case(
+        When(is_published=False, then=Value(Visibility.HIDDEN)),
+        default=release_case(now),
+    )
+
+
+def refresh_visibility(posts, now=None):
+    """Пересчитывает видимость постов выборки по флагам поста и категории.
+
+    Нужна после записей в обход Post.save(), например после loaddata.
+    """
+    now = now or timezone.now()
+    changed = posts.filter(category__is_published=True).update(
+        visibility=visibility_case(now))
+    changed += posts.exclude(category__is_published=True).update(
+        visibility=Visibility.HIDDEN)
+    return changed
+
+
+def refresh_category_visibility(category):
+    posts = Post.objects.filter(category=category)
+    if category.is_published:
+        changed = posts.update(visibility=visibility_case(timezone.now()))
+    else:
+        changed = posts.update(visibility=Visibility.HIDDEN)
+    forget_next_publication()
+    return changed
+
+
+def get_next_publication():
+    return Post.objects.filter(
+        visibility=Visibility.SCHEDULED
+    ).aggregate(next_at=Min('pub_date'))['next_at']
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def publish_due_posts(now=None):
+    """Открывает отложенные посты, чья дата публикации наступила.
+
+    Возвращает число открытых постов и время следующей публикации.
+    Запись идёт через serialized_write: там же, под общей блокировкой,
+    пересчитывается и время следующей публикации, поэтому сброс ключа
+    параллельной записью не затирается старым значением.
+    """
+    return serialized_write(_publish_due_posts, now)
+
+
+def _publish_due_posts(now=None, if_due=False):
+    if if_due and not is_publication_due():
+        # пока ждали блокировку, посты открыл другой запрос
+        return 0, None
+    # id нужны, чтобы сбросить закрытые шарды карты сайта со старыми постами
+    due = list(Post.objects.filter(
+        visibility=Visibility.SCHEDULED,
+        pub_date__lte=now or timezone.now()
+    ).order_by().values_list('pk', flat=True))
+    published = Post.objects.filter(
+        pk__in=due, visibility=Visibility.SCHEDULED
+    ).update(visibility=Visibility.VISIBLE) if due else 0
+    if published:
+        bump_feed_generation()
+        forget_shards('posts', due)
+    next_at = get_next_publication()
+    cache.set(
+        NEXT_PUBLICATION_KEY,
+        next_at.timestamp() if next_at else float('inf'),
+        None
+    )
+    return published, next_at
+
+
+def is_publication_due():
+    next_at = cache.get(NEXT_PUBLICATION_KEY)
+    return next_at is None or next_at <= time.time()
+
+
+def publish_due_posts_if_needed():
+    if is_publication_due():
+        serialized_write(_publish_due_posts, if_due=True)
@@ -0,0 +1,83 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'blog_post_fts'
+# вес заголовка и текста в ранжировании bm25
+RANK = f'bm25({FTS_TABLE}, 10.0, 1.0)'
+
+TOKEN = re.compile(r'\w+')
+
+
+def fts_enabled(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """Превращает ввод пользователя в запрос FTS5 без операторов.
+
+    Каждое слово ищется как префикс, все слова должны встретиться.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN.findall(query))
+
+
+def index_posts(cursor, rows):
+    cursor.executemany(
+        f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, text) '
+        'VALUES (%s, %s, %s)',
+        rows
+    )
+
+
+def index_post(post):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            index_posts(cursor, [(post.pk, post.title, post.text)])
+
+
+def remove_posts(pks):
+    if fts_enabled() and pks:
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                list(pks)
+            )
+
+
+def remove_post(pk):
+    remove_posts([pk])
+
+
+def match_filter(query):
+    """Условие «публикация подходит под запрос» для фильтрации без ранга."""
+    match = build_match_query(query)
+    if not match:
+        return Q(pk__in=[])
+    if not fts_enabled():
+        return Q(title__icontains=query) | Q(text__icontains=query)
+    return Q(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+    ))
+
+
+def search_posts(queryset, query):
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not fts_enabled():
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).order_by('-pub_date')
+    # bm25 считается только в запросе с MATCH, поэтому ранг берётся
+    # коррелированным подзапросом по rowid найденной публикации
+    table = queryset.model._meta.db_table
+    rank = RawSQL(
+        f'SELECT {RANK} FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+        [match]
+    )
+    return queryset.filter(match_filter(query)).alias(rank=rank).order_by(
+        'rank', '-pub_date')
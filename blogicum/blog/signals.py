@@ -0,0 +1,156 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_feed_generation, invalidate_card
+from .images import needs_renditions, schedule_renditions
+from .models import Post, Category, Location, Comment, Visibility
+from .scheduling import forget_next_publication, refresh_category_visibility
+from .search import index_post, remove_post
+from .sitemaps import forget_section, forget_shards
+
+User = get_user_model()
+
+# id постов, удаляемых в текущем потоке: счётчик их комментариев
+# не нужно уменьшать по одному при каскадном удалении
+_deleting = threading.local()
+
+
+def _deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@contextmanager
+def deleting_posts():
+    """Снимает метки постов, удаление которых завершилось ошибкой."""
+    marked = set(_deleting_posts())
+    try:
+        yield
+    finally:
+        _deleting_posts().intersection_update(marked)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_feeds(sender, **kwargs):
+    bump_feed_generation()
+
+
+@receiver(post_save, sender=Post)
+def reschedule_publication(sender, instance, **kwargs):
+    if instance.visibility == Visibility.SCHEDULED:
+        forget_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    # индексируются и сырые сохранения: иначе после loaddata поиск пуст
+    if instance.visibility == Visibility.DELETED:
+        remove_post(instance.pk)
+    else:
+        index_post(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_post_sitemap(sender, instance, **kwargs):
+    forget_shards('posts', [instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def forget_posts_sitemap(sender, **kwargs):
+    # видимость постов категории меняется одним UPDATE по всем шардам
+    forget_section('posts')
+
+
+@receiver(post_save, sender=Post)
+def make_image_renditions(sender, instance, raw=False, **kwargs):
+    if not raw and needs_renditions(instance):
+        pk = instance.pk
+        transaction.on_commit(lambda: schedule_renditions(pk))
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_category_visibility(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(
+        visibility=Visibility.HIDDEN)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, instance, **kwargs):
+    invalidate_card(sender._meta.model_name, instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, update_fields=None, **kwargs):
+    # при входе сохраняется только last_login — карточки не меняются
+    if update_fields is None or 'username' in update_fields:
+        invalidate_card('user', instance.pk)
+        forget_shards('authors', [instance.pk])
+    if update_fields is None or 'is_active' in update_fields:
+        # посты и профиль неактивного автора пропадают из лент
+        bump_feed_generation()
+
+
+@receiver(post_delete, sender=User)
+def forget_author_sitemap(sender, instance, **kwargs):
+    forget_shards('authors', [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    # комментарии меняют страницу поста, поэтому сдвигают и его updated_at
+    if raw:
+        return
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    invalidate_card('comments', instance.post_id)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts():
+        return
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        updated_at=timezone.now()
+    )
+    invalidate_card('comments', instance.post_id)
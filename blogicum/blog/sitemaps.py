@@ -0,0 +1,142 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import FileResponse, Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .caching import get_generation
+from .models import Category, Post, Visibility
+
+User = get_user_model()
+
+CONTENT_TYPE = 'application/xml'
+
+
+def post_entries(first_id, last_id):
+    rows = Post.objects.filter(
+        visibility=Visibility.VISIBLE, author__is_active=True,
+        pk__range=(first_id, last_id)
+    ).order_by('pk').values_list('pk', 'updated_at')
+    return [
+        (reverse('blog:post_detail', kwargs={'post_id': pk}), updated_at)
+        for pk, updated_at in rows
+    ]
+
+
+def author_entries(first_id, last_id):
+    usernames = User.objects.filter(
+        is_active=True, pk__range=(first_id, last_id)
+    ).order_by('pk').values_list('username', flat=True)
+    return [
+        (reverse('blog:profile', kwargs={'username': username}), None)
+        for username in usernames
+    ]
+
+
+# раздел: (модель, чьи id режутся на диапазоны, записи диапазона)
+SECTIONS = {
+    'posts': (Post, post_entries),
+    'authors': (User, author_entries),
+}
+
+
+def shard_range(shard):
+    size = settings.SITEMAP_SHARD_SIZE
+    return shard * size + 1, (shard + 1) * size
+
+
+def shard_of(pk):
+    return (pk - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def shard_count(section):
+    model, _ = SECTIONS[section]
+    max_id = model.objects.aggregate(max_id=Max('pk'))['max_id']
+    return shard_of(max_id) + 1 if max_id else 0
+
+
+def shard_path(section, shard):
+    return Path(settings.SITEMAP_ROOT) / f'{section}-{shard}.xml'
+
+
+def render_urlset(entries):
+    return render_to_string('sitemaps/urlset.xml', {
+        'site_url': settings.SITE_URL, 'entries': entries})
+
+
+def render_shard(section, shard):
+    _, entries = SECTIONS[section]
+    return render_urlset(entries(*shard_range(shard)))
+
+
+def write_shard(section, shard):
+    """Записывает закрытый шард на диск атомарной заменой файла."""
+    content = render_shard(section, shard)
+    path = shard_path(section, shard)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+    temporary.write_text(content, encoding='utf-8')
+    os.replace(temporary, path)
+    return content
+
+
+def forget_shards(section, pks):
+    for shard in {shard_of(pk) for pk in pks}:
+        shard_path(section, shard).unlink(missing_ok=True)
+
+
+def forget_section(section):
+    for path in Path(settings.SITEMAP_ROOT).glob(f'{section}-*.xml'):
+        path.unlink(missing_ok=True)
+
+
+def sitemap_index(request):
+    key = f'blog:sitemap-index:{get_generation("pages")}'
+    content = cache.get(key)
+    if content is None:
+        sitemaps = [reverse('blog:sitemap_categories')]
+        for section in SECTIONS:
+            sitemaps.extend(
+                reverse('blog:sitemap_shard', args=[section, shard])
+                for shard in range(shard_count(section))
+            )
+        content = render_to_string('sitemaps/index.xml', {
+            'site_url': settings.SITE_URL, 'sitemaps': sitemaps})
+        cache.set(key, content, settings.SITEMAP_CACHE_TIMEOUT)
+    return HttpResponse(content, content_type=CONTENT_TYPE)
+
+
+def sitemap_shard(request, section, shard):
+    """Закрытые шарды отдаются с диска, последний — из кэша поколения."""
+    if section not in SECTIONS:
+        raise Http404
+    count = shard_count(section)
+    if shard >= count:
+        raise Http404
+    if shard < count - 1:
+        path = shard_path(section, shard)
+        if path.exists():
+            return FileResponse(path.open('rb'), content_type=CONTENT_TYPE)
+        return HttpResponse(
+            write_shard(section, shard), content_type=CONTENT_TYPE)
+    key = f'blog:sitemap:{section}:{shard}:{get_generation("pages")}'
+    content = cache.get(key)
+    if content is None:
+        content = render_shard(section, shard)
+        cache.set(key, content, settings.SITEMAP_CACHE_TIMEOUT)
+    return HttpResponse(content, content_type=CONTENT_TYPE)
+
+
+def sitemap_categories(request):
+    slugs = Category.objects.filter(
+        is_published=True).order_by('pk').values_list('slug', 'updated_at')
+    entries = [
+        (reverse('blog:category_posts', args=[slug]), updated_at)
+        for slug, updated_at in slugs
+    ]
+    return HttpResponse(render_urlset(entries), content_type=CONTENT_TYPE)
@@ -0,0 +1,44 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# реентерабельная: запись может вызвать другую запись, например
+# middleware планировщика в запросе внутри serialized_write
+_write_lock = threading.RLock()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def serialized_write(func, *args, **kwargs):
+    """Выполняет запись по очереди с другими потоками процесса.
+
+    SQLite допускает одного писателя, поэтому потоки ждут на общей
+    блокировке, а не на busy_timeout базы. Если базу держит другой
+    процесс, запись повторяется с растущей паузой.
+    """
+    retries = settings.SQLITE_WRITE_RETRIES
+    for attempt in range(retries + 1):
+        with _write_lock:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if (attempt == retries or connection.in_atomic_block
+                        or not is_locked_error(error)):
+                    raise
+        time.sleep(settings.SQLITE_WRITE_BACKOFF * 2 ** attempt)
@@ -0,0 +1,39 @@
+import hashlib
+import os
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+IMAGES_DIR = 'post_images'
+
+
+def file_sha256(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(digest, filename):
+    """Раскладывает файлы по каталогам из первых символов хэша."""
+    extension = PurePosixPath(filename).suffix.lower()
+    return f'{IMAGES_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def post_image_path(instance, filename):
+    return hashed_name(instance.image_hash, filename)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы названы хэшем содержимого: одинаковые загрузки — один файл."""
+
+    def save(self, name, content, max_length=None):
+        if name is not None and self.exists(name):
+            # свежая дата защищает файл от очистки сирот, пока пост
+            # с новой ссылкой на него ещё не сохранён
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = 'blog'
 
@@ -17,6 +17,11 @@ post_urls = [
         views.PostDeleteView.as_view(),
         name='delete_post'
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         '<int:post_id>/comment/',
         views.CreateComment.as_view(),
@@ -36,6 +41,34 @@ post_urls = [
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
+    path('feeds/rss/', feeds.latest_rss, name='feed_rss'),
+    path('feeds/atom/', feeds.latest_atom, name='feed_atom'),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.category_rss, name='category_feed_rss'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.category_atom, name='category_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.author_rss, name='author_feed_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.author_atom, name='author_feed_atom'
+    ),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap_index'),
+    path(
+        'sitemaps/categories.xml',
+        sitemaps.sitemap_categories, name='sitemap_categories'
+    ),
+    path(
+        'sitemaps/<str:section>-<int:shard>.xml',
+        sitemaps.sitemap_shard, name='sitemap_shard'
+    ),
     path('posts/', include(post_urls)),
     path(
         'category/<slug:category_slug>/',
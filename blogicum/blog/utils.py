@@ -1,7 +1,211 @@
+import base64
+from datetime import datetime
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import get_feed_count
+from .models import Comment
+
+
+def get_page_objects(elements, request, count_key=None, keyset=None):
+    if keyset is None:
+        keyset = settings.FEED_PAGINATION == 'keyset'
+    if keyset:
+        paginator = KeysetPaginator(elements, settings.PAGE_ELEM)
+        return paginator.get_page(request.GET.get('cursor'))
+    if count_key is None:
+        paginator = Paginator(elements, settings.PAGE_ELEM)
+    else:
+        paginator = CachedCountPaginator(
+            elements, settings.PAGE_ELEM, count_key)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def get_comments_paginator(post_id):
+    return KeysetPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        settings.COMMENTS_PAGE_ELEM, key='created_at', descending=False
+    )
+
+
+class CachedCountPaginator(Paginator):
+    """Берёт число объектов ленты из кэша вместо COUNT(*) на каждый запрос."""
+
+    def __init__(self, object_list, per_page, count_key, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        return get_feed_count(self.count_key, self.object_list)
+
+    @cached_property
+    def count_is_estimate(self):
+        """Подсчёт упёрся в FEED_COUNT_ESTIMATE_LIMIT: объектов не меньше."""
+        return (settings.FEED_COUNT_ESTIMATE
+                and self.count >= settings.FEED_COUNT_ESTIMATE_LIMIT)
+
+    def page(self, number):
+        if not self.count_is_estimate:
+            return super().page(number)
+        # страницы за оценкой существуют, пока есть строки: на каждую
+        # выбирается одна лишняя, чтобы знать, есть ли следующая
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('Страница не содержит результатов')
+        if len(rows) > self.per_page:
+            self.count = max(self.count, bottom + len(rows))
+        else:
+            self.count = bottom + len(rows)
+        self.__dict__.pop('num_pages', None)
+        return self._get_page(rows[:self.per_page], number, self)
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+
+class LimitedCountPaginator(Paginator):
+    """Считает строки не дальше ADMIN_COUNT_LIMIT — для огромных таблиц."""
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        return self.object_list.order_by()[:limit].count()
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(value, pk, direction):
+    raw = f'{direction}|{value.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, value, pk = raw.split('|')
+        if direction not in ('n', 'p'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(value), int(pk), direction
+    except (ValueError, UnicodeDecodeError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+class KeysetPaginator:
+    """Пагинация по ключу (key, id) без OFFSET и COUNT(*).
+
+    По умолчанию — ленты «от новых к старым» по pub_date; с descending=False
+    порядок прямой, как у комментариев.
+    """
+
+    def __init__(self, object_list, per_page, key='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key = key
+        self.descending = descending
+
+    def get_page(self, cursor):
+        if cursor:
+            try:
+                return self.page(*decode_cursor(cursor))
+            except InvalidCursor:
+                pass
+        return self.page()
+
+    def _ordered_after(self, value, pk, backwards):
+        """Строки после (value, pk) в порядке обхода."""
+        descending = self.descending != backwards
+        sign, lookup = ('-', 'lt') if descending else ('', 'gt')
+        queryset = self.object_list.order_by(f'{sign}{self.key}', f'{sign}id')
+        if value is None:
+            return queryset
+        return queryset.filter(
+            Q(**{f'{self.key}__{lookup}': value})
+            | Q(**{self.key: value, f'id__{lookup}': pk})
+        )
+
+    def page(self, value=None, pk=None, direction='n'):
+        backwards = direction == 'p'
+        queryset = self._ordered_after(value, pk, backwards)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not backwards:
+            return KeysetPage(
+                rows, self,
+                has_next=has_more, has_previous=value is not None
+            )
+        rows.reverse()
+        return KeysetPage(rows, self, has_next=True, has_previous=has_more)
+
+    def cursor_for(self, obj):
+        """Курсор страницы с объектом при разбиении с самого начала."""
+        before = self._ordered_after(
+            getattr(obj, self.key), obj.pk, backwards=True)
+        position = before.count()
+        if position < self.per_page:
+            return None
+        boundary = before[position % self.per_page]
+        return encode_cursor(getattr(boundary, self.key), boundary.pk, 'n')
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def _cursor(self, obj, direction):
+        key = getattr(obj, self.paginator.key)
+        return encode_cursor(key, obj.pk, direction)
 
+    def next_cursor(self):
+        if self._has_next:
+            return self._cursor(self.object_list[-1], 'n')
+        return None
 
-def get_page_objects(elements, page_number):
-    paginator = Paginator(elements, settings.PAGE_ELEM)
-    return paginator.get_page(page_number)
+    def previous_cursor(self):
+        if self._has_previous:
+            return self._cursor(self.object_list[0], 'p')
+        return None
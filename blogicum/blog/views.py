@@ -1,16 +1,27 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.views.decorators.http import condition
 from django.views.generic import CreateView, UpdateView, DeleteView
 
-from .models import Post, Category, Comment
+from .models import Post, Category, Comment, Visibility
+from .caching import (
+    cache_anonymous_page, set_body_version, set_card_versions)
+from .conditional import (
+    feed_etag, get_reader_post, post_etag, post_last_modified)
 from .forms import PostForm, CommentForm
-from .mixins import PostActionMixin, CommentActionMixin
-from .utils import get_page_objects
+from .mixins import (
+    PostActionMixin, CommentActionMixin, SerializedWriteMixin)
+from .reaper import soft_delete_post
+from .routers import read_from_replica
+from .search import search_posts
+from .sqlite import serialized_write
+from .utils import get_comments_paginator, get_page_objects
 
 
 User = get_user_model()
@@ -21,17 +32,16 @@ def get_base_queryset():
         'category',
         'author',
         'location'
-    ).filter(
-        pub_date__lte=timezone.now(),
-        is_published=True,
-        category__is_published=True
-    )
+    ).filter(visibility=Visibility.VISIBLE, author__is_active=True)
 
 
+@read_from_replica
+@condition(etag_func=feed_etag)
+@cache_anonymous_page
 def index(request):
-    post_list = get_base_queryset().annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
-    page_obj = get_page_objects(post_list, request.GET.get('page'))
+    post_list = get_base_queryset().order_by('-pub_date')
+    page_obj = get_page_objects(post_list, request, count_key='index')
+    set_card_versions(page_obj)
     return render(
         request=request,
         template_name='blog/index.html',
@@ -39,31 +49,80 @@ def index(request):
     )
 
 
-def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    if (post.pub_date > timezone.now() or not post.is_published
-       or not post.category.is_published) and post.author != request.user:
+@read_from_replica
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        post_list = search_posts(get_base_queryset(), query)
+        page_obj = get_page_objects(post_list, request, keyset=False)
+        set_card_versions(page_obj)
+    return render(
+        request=request,
+        template_name='blog/search.html',
+        context={
+            'query': query,
+            'page_obj': page_obj,
+            'page_query': urlencode({'q': query}) + '&' if query else '',
+        }
+    )
+
+
+def get_post_for_reader(request, post_id):
+    post = get_reader_post(request, post_id)
+    if post is None:
         raise Http404
+    return post
+
+
+@read_from_replica
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def post_detail(request, post_id):
+    post = get_post_for_reader(request, post_id)
+    # тело статьи кэшируется по версиям поста, категории, места и автора;
+    # комментарии выводятся отдельно и всегда свежие
+    set_body_version(post)
+    comments = get_comments_paginator(post.pk).get_page(
+        request.GET.get('comments'))
     return render(
         request=request,
         template_name='blog/detail.html',
         context={
             'post': post,
             'form': CommentForm(),
-            'comments': post.comments.select_related('author').all()
+            'comments': comments,
+            'body_cache_timeout': settings.POST_BODY_CACHE_TIMEOUT,
         }
     )
 
 
+@read_from_replica
+def post_comments(request, post_id):
+    """Следующая страница комментариев для кнопки «Показать ещё»."""
+    post = get_post_for_reader(request, post_id)
+    comments = get_comments_paginator(post.pk).get_page(
+        request.GET.get('cursor'))
+    return render(
+        request=request,
+        template_name='includes/comment_list.html',
+        context={'post': post, 'comments': comments, 'fragment': True}
+    )
+
+
+@read_from_replica
+@condition(etag_func=feed_etag)
+@cache_anonymous_page
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True
     )
-    post_list = get_base_queryset().filter(category=category).annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
-    page_obj = get_page_objects(post_list, request.GET.get('page'))
+    post_list = get_base_queryset().filter(
+        category=category).order_by('-pub_date')
+    page_obj = get_page_objects(
+        post_list, request, count_key=f'category:{category.pk}')
+    set_card_versions(page_obj)
     context = {
         'page_obj': page_obj,
         'category': category
@@ -75,16 +134,20 @@ def category_posts(request, category_slug):
     )
 
 
+@read_from_replica
+@condition(etag_func=feed_etag)
 def profile_user(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.annotate(
-        comment_count=Count('comments')).order_by('-pub_date').all()
+    user = get_object_or_404(User, username=username, is_active=True)
+    posts = user.posts.select_related(
+        'category', 'author', 'location').order_by('-pub_date')
 
+    count_key = f'profile:{user.pk}:owner'
     if user != request.user:
-        posts = posts.filter(pub_date__lte=timezone.now(), is_published=True,
-                             category__is_published=True)
+        posts = posts.filter(visibility=Visibility.VISIBLE)
+        count_key = f'profile:{user.pk}:public'
 
-    page_obj = get_page_objects(posts, request.GET.get('page'))
+    page_obj = get_page_objects(posts, request, count_key=count_key)
+    set_card_versions(page_obj)
     context = {
         'profile': user,
         'page_obj': page_obj
@@ -109,7 +172,7 @@ class UpdateProfileView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(SerializedWriteMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -125,18 +188,22 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(PostActionMixin, LoginRequiredMixin, UpdateView):
+class PostUpdateView(PostActionMixin, SerializedWriteMixin,
+                     LoginRequiredMixin, UpdateView):
     form_class = PostForm
 
     def get_success_url(self):
-        return reverse_lazy(
-            'blog:post_detail',
-            kwargs={'post_id': self.get_object().id}
-        )
+        return self.object.get_absolute_url()
 
 
 class PostDeleteView(PostActionMixin, LoginRequiredMixin, DeleteView):
 
+    def delete(self, request, *args, **kwargs):
+        # пост скрывается сразу, комментарии удаляет фоновая очистка
+        self.object = self.get_object()
+        serialized_write(soft_delete_post, self.object)
+        return HttpResponseRedirect(self.get_success_url())
+
     def get_success_url(self) -> str:
         return reverse_lazy(
             'blog:profile',
@@ -144,7 +211,7 @@ class PostDeleteView(PostActionMixin, LoginRequiredMixin, DeleteView):
         )
 
 
-class CreateComment(LoginRequiredMixin, CreateView):
+class CreateComment(SerializedWriteMixin, LoginRequiredMixin, CreateView):
     _post = None
     model = Comment
     form_class = CommentForm
@@ -159,12 +226,11 @@ class CreateComment(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse_lazy(
-            'blog:post_detail',
-            kwargs={'post_id': self._post.pk})
+        return self.object.get_absolute_url()
 
 
-class UpdateComment(CommentActionMixin, LoginRequiredMixin, UpdateView):
+class UpdateComment(CommentActionMixin, SerializedWriteMixin,
+                    LoginRequiredMixin, UpdateView):
     form_class = CommentForm
 
 
@@ -6,6 +6,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,12 +41,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.routers.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.ratelimit.RateLimitMiddleware',
+    'blog.middleware.PublicationSchedulerMiddleware',
+    'blog.budgets.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -82,6 +87,44 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения. Для локальной проверки BLOGICUM_SQLITE_REPLICAS=2
+# подключает два файла SQLite, которые заполняет команда sync_replicas.
+DATABASE_REPLICAS = [
+    f'replica{number}'
+    for number in range(1, int(os.environ.get('BLOGICUM_SQLITE_REPLICAS', 0)) + 1)
+]
+
+DATABASES.update({
+    alias: {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+    for alias in DATABASE_REPLICAS
+})
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Профиль SQLite для продакшена (BLOGICUM_SQLITE_PRODUCTION=1): WAL позволяет
+# читать во время записи, busy_timeout ждёт блокировку вместо ошибки.
+SQLITE_PRAGMAS = {}
+
+if os.environ.get('BLOGICUM_SQLITE_PRODUCTION'):
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5000,
+    }
+
+# Повторы записи через blog.sqlite.serialized_write при «database is locked».
+SQLITE_WRITE_RETRIES = 5
+
+SQLITE_WRITE_BACKOFF = 0.05
+
+# Сколько секунд после записи чтение пользователя идёт в основную базу.
+REPLICA_STICKY_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -143,3 +186,91 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 PAGE_ELEM = 10
+
+COMMENTS_PAGE_ELEM = 20
+
+# 'offset' — постраничная навигация с номерами страниц,
+# 'keyset' — навигация по курсору ?cursor= без OFFSET и COUNT(*)
+FEED_PAGINATION = 'offset'
+
+# Число публикаций в лентах кэшируется на FEED_COUNT_CACHE_TIMEOUT секунд
+# и сбрасывается сигналами при изменении публикаций и категорий.
+# При FEED_COUNT_ESTIMATE = True подсчёт останавливается на
+# FEED_COUNT_ESTIMATE_LIMIT строках — для очень больших таблиц.
+FEED_COUNT_CACHE_TIMEOUT = 60
+
+FEED_COUNT_ESTIMATE = False
+
+FEED_COUNT_ESTIMATE_LIMIT = 10000
+
+# Списки админки не считают больше ADMIN_COUNT_LIMIT строк: дальше
+# последней доступной страницы листать незачем, есть фильтры и поиск.
+ADMIN_COUNT_LIMIT = 10000
+
+# Страницы лент для анонимных читателей кэшируются целиком; последняя копия
+# хранится дольше и отдаётся, если база данных занята.
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60
+
+ANONYMOUS_PAGE_STALE_TIMEOUT = 60 * 60 * 24
+
+# Уменьшенные копии изображений постов готовит фоновый пул из
+# THUMBNAIL_WORKERS потоков; при 0 пул выключен и копии готовит только
+# команда build_image_renditions (например, по расписанию).
+THUMBNAIL_WORKERS = 2
+
+THUMBNAIL_QUALITY = 82
+
+# Тело статьи на странице поста кэшируется до изменения поста, категории,
+# места или автора; 0 отключает кэш.
+POST_BODY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# RSS/Atom-ленты: число записей, длина анонса в словах и срок хранения
+# готового XML (сбрасывается при любом изменении публикаций).
+SYNDICATION_ITEMS = 20
+
+SYNDICATION_WORDS = 50
+
+SYNDICATION_CACHE_TIMEOUT = 60 * 60
+
+# Адрес сайта для абсолютных ссылок в sitemap.xml.
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Карта сайта делится на шарды по SITEMAP_SHARD_SIZE id; закрытые шарды
+# хранятся файлами в SITEMAP_ROOT (команда build_sitemaps), последний
+# собирается по запросу и кэшируется до изменения публикаций.
+SITEMAP_SHARD_SIZE = 10000
+
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+
+# Ограничение частоты записей (blog/ratelimit.py): для каждого представления
+# корзина на burst запросов, которая пополняется requests запросами за period
+# секунд, отдельно для пользователя и для IP-адреса. Счётчики хранит
+# RATE_LIMIT_STORE: LocalCounterStore (память процесса), FileCounterStore
+# (параметр path) или DatabaseCounterStore.
+RATE_LIMIT_ENABLE = True
+
+RATE_LIMITS = {
+    'blog:add_comment': {'requests': 10, 'period': 60, 'burst': 5},
+    'blog:create_post': {'requests': 10, 'period': 60 * 60, 'burst': 3},
+}
+
+RATE_LIMIT_STORE = 'blog.ratelimit.LocalCounterStore'
+
+RATE_LIMIT_STORE_OPTIONS = {}
+
+# Массовые действия админки меняют и удаляют строки порциями по
+# MODERATION_CHUNK_SIZE id, каждую — отдельной короткой транзакцией.
+MODERATION_CHUNK_SIZE = 500
+
+# Удалённые посты и пользователи сразу скрываются, а их комментарии и
+# публикации удаляет фоновый поток порциями по REAPER_BATCH_SIZE строк;
+# при REAPER_WORKERS = 0 незавершённые удаления выполняет команда
+# reap_deletions.
+REAPER_WORKERS = 1
+
+REAPER_BATCH_SIZE = 500
+
+# Превышение бюджета SQL-запросов страницы (blog/budgets.py) вызывает ошибку.
+QUERY_BUDGET_ENFORCE = DEBUG
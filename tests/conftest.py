@@ -81,6 +81,40 @@ def mixer():
     return _mixer
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_thumbnail_workers(settings):
+    settings.THUMBNAIL_WORKERS = 0
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limits(settings):
+    settings.RATE_LIMIT_ENABLE = False
+
+
+@pytest.fixture(autouse=True)
+def no_reaper_workers(settings):
+    settings.REAPER_WORKERS = 0
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+        django_db_modify_db_settings_parallel_suffix):
+    # реплика в тестах — зеркало тестовой базы, как при
+    # BLOGICUM_SQLITE_REPLICAS; представления читают с неё, только если
+    # тест включит её в DATABASE_REPLICAS
+    from django.conf import settings
+    settings.DATABASES.setdefault('replica1', {
+        **settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}})
+
+
 @pytest.fixture
 def user(mixer):
     User = get_user_model()
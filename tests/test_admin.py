@@ -0,0 +1,215 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _changelist(admin_client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, params)
+    assert response.status_code == 200, response.content[:500]
+    return response, len(queries)
+
+
+@pytest.mark.parametrize('url, fk_names', [
+    ('/admin/blog/post/', ('author', 'location')),
+    ('/admin/blog/comment/', ('post', 'author')),
+])
+def test_admin_changelist_queries_do_not_grow(
+        mixer, admin_client, published_location, url, fk_names):
+    def fill(count):
+        posts = mixer.cycle(count).blend(
+            'blog.Post', location=published_location)
+        for post in posts:
+            mixer.blend('blog.Comment', post=post)
+
+    fill(2)
+    _, few = _changelist(admin_client, url)
+    fill(8)
+    response, many = _changelist(admin_client, url)
+    assert many == few, (
+        f'Убедитесь, что число запросов списка `{url}` в админке не зависит '
+        'от количества строк.'
+    )
+    filters = response.context['cl'].filter_specs
+    for name in fk_names:
+        spec = next(
+            spec for spec in filters
+            if getattr(spec, 'field_name', None) == name
+        )
+        assert not spec.lookup_choices, (
+            'Убедитесь, что фильтры по внешним ключам в админке не выводят '
+            'полный список объектов.'
+        )
+    assert 'admin/js/autocomplete.js' in response.content.decode()
+
+
+def test_admin_post_search_and_filter(
+        mixer, admin_client, user, another_user):
+    wanted = mixer.blend('blog.Post', title='Искомый заголовок', author=user)
+    mixer.blend('blog.Post', title='Другой', author=another_user)
+
+    response, _ = _changelist(admin_client, '/admin/blog/post/', q='искомый')
+    assert list(response.context['cl'].result_list) == [wanted], (
+        'Убедитесь, что поиск в админке находит публикации по заголовку.'
+    )
+    response, _ = _changelist(
+        admin_client, '/admin/blog/post/', q=user.username)
+    assert list(response.context['cl'].result_list) == [wanted], (
+        'Убедитесь, что поиск в админке находит публикации по имени автора.'
+    )
+    response, _ = _changelist(
+        admin_client, '/admin/blog/post/', author__id__exact=user.id)
+    assert list(response.context['cl'].result_list) == [wanted]
+
+
+def test_admin_count_is_limited(settings, mixer, admin_client):
+    settings.ADMIN_COUNT_LIMIT = 3
+    mixer.cycle(5).blend('blog.Post')
+    response, _ = _changelist(admin_client, '/admin/blog/post/')
+    assert response.context['cl'].result_count == 3, (
+        'Убедитесь, что список публикаций в админке не считает строки '
+        'дальше `ADMIN_COUNT_LIMIT`.'
+    )
+
+
+def test_admin_category_inline_loads_one_page(
+        mixer, admin_client, published_category):
+    url = f'/admin/blog/category/{published_category.id}/change/'
+
+    def fill(count):
+        mixer.cycle(count).blend('blog.Post', category=published_category)
+
+    fill(2)
+    # первый запрос после изменений публикует отложенные посты
+    _changelist(admin_client, url)
+    _, few = _changelist(admin_client, url)
+    fill(25)
+    _changelist(admin_client, url)
+    response, many = _changelist(admin_client, url)
+    assert many == few, (
+        'Убедитесь, что число запросов на странице категории в админке '
+        'не зависит от количества публикаций в ней.'
+    )
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == 10, (
+        'Убедитесь, что на странице категории в админке выводится только '
+        'одна страница публикаций.'
+    )
+    assert (
+        f'/admin/blog/post/?category__id__exact={published_category.id}'
+        in response.content.decode()
+    ), 'Добавьте ссылку на список всех публикаций категории.'
+    response = admin_client.post(url, {
+        'title': published_category.title,
+        'description': published_category.description,
+        'slug': published_category.slug,
+        'is_published': 'on',
+        'posts-TOTAL_FORMS': '10',
+        'posts-INITIAL_FORMS': '10',
+    })
+    assert response.status_code == 302, (
+        'Убедитесь, что категорию можно сохранить в админке.'
+    )
+
+
+@pytest.fixture
+def moderated_posts(settings, mixer, user, published_category):
+    settings.MODERATION_CHUNK_SIZE = 2
+    return mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1)
+    )
+
+
+@pytest.fixture
+def feed_bumps(monkeypatch):
+    from blog import moderation
+
+    calls = []
+    bump = moderation.bump_feed_generation
+    monkeypatch.setattr(
+        moderation, 'bump_feed_generation',
+        lambda: calls.append(1) or bump())
+    return calls
+
+
+def _run_action(admin_client, model, action, objects, **data):
+    response = admin_client.post(f'/admin/blog/{model}/', {
+        'action': action,
+        '_selected_action': [obj.pk for obj in objects],
+        **data,
+    })
+    assert response.status_code == 302, response.content[:500]
+
+
+def test_admin_bulk_publish_actions(
+        admin_client, moderated_posts, feed_bumps, published_category):
+    from blog.models import Post, Visibility
+
+    _run_action(admin_client, 'post', 'unpublish', moderated_posts)
+    assert not Post.objects.filter(
+        visibility=Visibility.VISIBLE).exists(), (
+        'Убедитесь, что действие «снять с публикации» скрывает все '
+        'выбранные публикации.'
+    )
+    assert len(feed_bumps) == 1, (
+        'Убедитесь, что массовое действие сбрасывает кэши лент один раз, '
+        'а не для каждой строки.'
+    )
+    _run_action(admin_client, 'post', 'publish', moderated_posts[:3])
+    assert Post.objects.filter(visibility=Visibility.VISIBLE).count() == 3
+
+    _run_action(
+        admin_client, 'category', 'unpublish', [published_category])
+    assert not Post.objects.filter(
+        visibility=Visibility.VISIBLE).exists(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+
+
+def test_admin_bulk_move_and_delete(
+        admin_client, mixer, moderated_posts, feed_bumps,
+        published_category):
+    from blog.models import Comment, Post
+    from blog.search import search_posts
+
+    other = mixer.blend('blog.Category', is_published=False)
+    _run_action(
+        admin_client, 'post', 'move_to_category', moderated_posts[:2],
+        category=other.pk
+    )
+    assert Post.objects.filter(category=other).count() == 2
+    assert Post.objects.get(pk=moderated_posts[0].pk).visibility == 0
+
+    doomed = moderated_posts[2:]
+    for post in doomed:
+        mixer.cycle(3).blend('blog.Comment', post=post)
+    title = doomed[0].title
+    _run_action(admin_client, 'post', 'delete_with_comments', doomed)
+    assert not Post.objects.filter(pk__in=[p.pk for p in doomed]).exists()
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что массовое удаление убирает и комментарии публикаций.'
+    )
+    assert not search_posts(Post.objects.all(), title).exists()
+    assert len(feed_bumps) == 2
+
+
+def test_admin_bulk_unpublish_refreshes_cards(
+        user, user_client, admin_client, moderated_posts):
+    url = f'/profile/{user.username}/'
+    badge = 'Пост снят с публикации админом'
+    assert badge not in user_client.get(url).content.decode()
+    _run_action(admin_client, 'post', 'unpublish', moderated_posts)
+    assert badge in user_client.get(url).content.decode(), (
+        'Убедитесь, что массовое снятие с публикации сбрасывает кэш '
+        'карточек выбранных постов.'
+    )
+    _run_action(admin_client, 'post', 'publish', moderated_posts)
+    assert badge not in user_client.get(url).content.decode()
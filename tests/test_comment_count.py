@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_comment_count_follows_writes(
+        mixer, user, user_client, another_user, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что `Post.comment_count` увеличивается при создании '
+        'комментария.'
+    )
+
+    comment = post.comments.filter(author=user).first()
+    user_client.post(
+        f'/posts/{post.id}/delete_comment/{comment.id}/')
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 1, (
+        'Убедитесь, что `Post.comment_count` уменьшается при удалении '
+        'комментария, в том числе каскадном.'
+    )
+
+
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend('blog.Comment', post=post)
+    type(post).objects.update(comment_count=0)
+    call_command('rebuild_comment_counts', chunk_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 4
+
+
+def test_failed_post_deletion_keeps_comment_count(
+        mixer, another_user, post_with_published_location):
+    from django.db import transaction
+    from django.db.models.signals import pre_delete
+    from blog.models import Post
+
+    post = post_with_published_location
+    comment, _ = mixer.cycle(2).blend(
+        'blog.Comment', post=post, author=another_user)
+
+    def fail(sender, **kwargs):
+        raise RuntimeError('сбой удаления')
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+    comment.delete()
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 1, (
+        'Убедитесь, что неудачное удаление поста не мешает потом '
+        'уменьшать его счётчик комментариев.'
+    )
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def thread(settings, mixer, user, post_with_published_location):
+    settings.COMMENTS_PAGE_ELEM = 3
+    post = post_with_published_location
+    comments = mixer.cycle(8).blend('blog.Comment', post=post, author=user)
+    now = timezone.now()
+    # пары с одинаковым временем проверяют порядок по id
+    for index, comment in enumerate(comments):
+        comment.created_at = now + timedelta(minutes=index // 2)
+    type(comments[0]).objects.bulk_update(comments, ['created_at'])
+    return post, comments
+
+
+def test_comments_load_more(client, thread):
+    post, comments = thread
+    response = client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    seen = [comment.id for comment in page]
+    assert seen == [comment.id for comment in comments[:3]], (
+        'Убедитесь, что на странице поста выводится только первая страница '
+        'комментариев в порядке их создания.'
+    )
+    while page.has_next():
+        fragment = client.get(
+            f'/posts/{post.id}/comments/', {'cursor': page.next_cursor()})
+        assert fragment.status_code == 200
+        assert '<html' not in fragment.content.decode()
+        page = fragment.context['comments']
+        seen.extend(comment.id for comment in page)
+    assert seen == [comment.id for comment in comments], (
+        'Убедитесь, что кнопка «Показать ещё» по очереди выдаёт все '
+        'комментарии без пропусков и повторов.'
+    )
+
+
+def test_comment_url_lands_on_its_page(client, thread):
+    post, comments = thread
+    for index, comment in enumerate(comments):
+        url = comment.get_absolute_url()
+        parts = urlsplit(url)
+        assert parts.fragment == f'comment_{comment.id}'
+        response = client.get(parts.path, parse_qs(parts.query))
+        page = [item.id for item in response.context['comments']]
+        start = index - index % 3
+        assert page == [item.id for item in comments[start:start + 3]], (
+            'Убедитесь, что `Comment.get_absolute_url` ведёт на страницу '
+            'комментариев, где находится комментарий.'
+        )
+
+
+def test_comment_fragment_hides_unpublished_post(client, thread):
+    post, _ = thread
+    post.is_published = False
+    post.save()
+    assert client.get(f'/posts/{post.id}/comments/').status_code == 404
@@ -0,0 +1,96 @@
+import pytest
+from django.utils.http import http_date
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_feeds_answer_not_modified(
+        client, mixer, user, published_category, post_with_published_location,
+        url_name):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    response = client.get(url)
+    assert response.status_code == 200 and response.has_header('ETag')
+    not_modified = _revalidate(client, url, response)
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что лента отвечает 304, если с прошлого запроса '
+        'ничего не изменилось.'
+    )
+    assert not not_modified.content
+
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    assert _revalidate(client, url, response).status_code == 200, (
+        'Убедитесь, что после изменений лента снова отдаётся целиком.'
+    )
+
+
+def test_feeds_do_not_validate_missing_owner(
+        client, user, another_user, published_category,
+        post_with_published_location):
+    # у вошедшего пользователя страницы не берутся из кэша анонимов
+    client.force_login(another_user)
+    category_url = f'/category/{published_category.slug}/'
+    profile_url = f'/profile/{user.username}/'
+    category_response = client.get(category_url)
+    profile_response = client.get(profile_url)
+    published_category.is_published = False
+    published_category.save()
+    user.is_active = False
+    user.save()
+    assert _revalidate(
+        client, category_url, category_response).status_code == 404
+    assert _revalidate(
+        client, profile_url, profile_response).status_code == 404, (
+        'Убедитесь, что лента скрытой категории или неактивного автора '
+        'не отвечает 304 по старому ETag.'
+    )
+
+
+def test_post_detail_conditional_get(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    response = client.get(url)
+    assert _revalidate(client, url, response).status_code == 304
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304, (
+        'Убедитесь, что страница поста отвечает на `If-Modified-Since`.'
+    )
+
+    comment = mixer.blend('blog.Comment', post=post)
+    response = _revalidate(client, url, response)
+    assert response.status_code == 200, (
+        'Убедитесь, что новый комментарий меняет валидаторы страницы поста.'
+    )
+    comment.text = 'Исправленный текст'
+    comment.save()
+    assert _revalidate(client, url, response).status_code == 200, (
+        'Убедитесь, что правка комментария меняет валидаторы страницы поста.'
+    )
+
+    response = client.get(url)
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert _revalidate(client, url, response).status_code == 200
+    before_change = http_date(post.location.updated_at.timestamp() - 1)
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=before_change).status_code == 200
+
+
+def test_hidden_post_has_no_validators(client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/', HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == 404
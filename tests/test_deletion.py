@@ -0,0 +1,121 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def reaper_batches(settings):
+    settings.REAPER_BATCH_SIZE = 2
+
+
+def test_post_is_hidden_then_reaped(
+        user_client, client, mixer, post_with_published_location,
+        reaper_batches):
+    from blog.models import Comment, DeletionJob, Post
+
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == 302
+    assert client.get(f'/posts/{post.id}/').status_code == 404, (
+        'Убедитесь, что удалённый пост сразу перестаёт открываться.'
+    )
+    assert user_client.get(f'/posts/{post.id}/').status_code == 404
+    assert Comment.objects.filter(post_id=post.id).count() == 5, (
+        'Убедитесь, что комментарии удалённого поста удаляются фоном, '
+        'а не в запросе на удаление.'
+    )
+    job = DeletionJob.objects.get()
+    assert job.finished_at is None
+
+    call_command('reap_deletions')
+    job.refresh_from_db()
+    assert not Post.all_objects.filter(pk=post.id).exists()
+    assert not Comment.objects.filter(post_id=post.id).exists()
+    assert job.finished_at is not None
+    assert job.deleted_rows == 6, (
+        'Убедитесь, что фоновое удаление отмечает число удалённых строк.'
+    )
+
+
+def test_admin_user_deletion_is_soft(
+        admin_client, client, mixer, user, another_user,
+        published_category, reaper_batches):
+    from django.contrib.auth import get_user_model
+    from blog.models import DeletionJob, Post
+
+    own = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True
+    )
+    other_post = mixer.blend(
+        'blog.Post', author=another_user, category=published_category)
+    mixer.cycle(3).blend('blog.Comment', post=own[0])
+    mixer.cycle(2).blend('blog.Comment', post=other_post, author=user)
+    mixer.blend('blog.Comment', post=other_post, author=another_user)
+
+    url = f'/admin/auth/user/{user.pk}/delete/'
+    assert admin_client.get(url).status_code == 200
+    response = admin_client.post(url, {'post': 'yes'})
+    assert response.status_code == 302
+    assert client.get(f'/profile/{user.username}/').status_code == 404
+    assert client.get(f'/posts/{own[0].id}/').status_code == 404
+    assert own[0].title not in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что посты удалённого пользователя сразу скрываются.'
+    )
+    assert Post.objects.filter(author=user).count() == 3, (
+        'Убедитесь, что посты удалённого пользователя помечаются '
+        'фоновой задачей, а не в запросе на удаление.'
+    )
+
+    call_command('reap_deletions')
+    assert not get_user_model().objects.filter(pk=user.pk).exists()
+    assert not Post.all_objects.filter(author_id=user.pk).exists()
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 1, (
+        'Убедитесь, что фоновое удаление пересчитывает число комментариев '
+        'чужих постов.'
+    )
+    assert DeletionJob.objects.get().deleted_rows == 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reaping_in_worker(
+        settings, mixer, user, published_category, reaper_batches):
+    from blog.models import Comment, DeletionJob, Post
+    from blog.reaper import schedule_reaping, soft_delete_user
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category)
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    job = soft_delete_user(user)
+    settings.REAPER_WORKERS = 1
+    assert schedule_reaping(job.pk).result(timeout=30) is True, (
+        'Убедитесь, что фоновый поток выполняет задачу удаления.'
+    )
+    assert DeletionJob.objects.get().finished_at is not None
+    assert not Post.all_objects.exists()
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reaping_in_worker_logs_errors(
+        settings, monkeypatch, caplog, user):
+    from blog import reaper
+    from blog.models import DeletionJob
+
+    job = reaper.soft_delete_user(user)
+    settings.REAPER_WORKERS = 1
+
+    def fail(job):
+        raise ValueError('сбой')
+
+    monkeypatch.setitem(reaper.REAPERS, DeletionJob.Kind.USER, fail)
+    assert reaper.schedule_reaping(job.pk).result(timeout=30) is False
+    assert 'Не удалось завершить фоновое удаление' in caplog.text, (
+        'Убедитесь, что фоновый поток записывает в журнал любые ошибки.'
+    )
+    assert DeletionJob.objects.get().finished_at is None
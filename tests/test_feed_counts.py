@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_feed_count_is_cached_and_invalidated(
+        client, mixer, user, published_category,
+        many_posts_with_published_locations):
+    response = client.get('/')
+    assert response.context['page_obj'].paginator.count == N_PER_PAGE * 2
+
+    from blog.caching import get_feed_count
+    from blog.views import get_base_queryset
+    # повторное чтение не обращается к базе
+    assert get_feed_count('index', get_base_queryset().none()) == (
+        N_PER_PAGE * 2)
+
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=True,
+                pub_date=many_posts_with_published_locations[0].pub_date)
+    response = client.get('/')
+    assert response.context['page_obj'].paginator.count == (
+        N_PER_PAGE * 2 + 1), (
+        'Убедитесь, что кэш числа публикаций сбрасывается при создании '
+        'публикации.'
+    )
+
+
+def test_feed_count_estimate(settings, client,
+                             many_posts_with_published_locations):
+    settings.FEED_COUNT_ESTIMATE = True
+    settings.FEED_COUNT_ESTIMATE_LIMIT = N_PER_PAGE + 1
+    response = client.get('/')
+    assert response.context['page_obj'].paginator.count == N_PER_PAGE + 1
+
+
+def test_feed_count_estimate_keeps_next_pages(
+        settings, client, many_posts_with_published_locations):
+    settings.FEED_COUNT_ESTIMATE = True
+    settings.FEED_COUNT_ESTIMATE_LIMIT = N_PER_PAGE // 2
+    page_obj = client.get('/').context['page_obj']
+    assert page_obj.has_next(), (
+        'Убедитесь, что при оценке числа публикаций лента показывает '
+        'ссылку на следующую страницу за пределами оценки.'
+    )
+    assert 'Последняя' not in client.get('/').content.decode('utf-8')
+    page_obj = client.get('/', {'page': 2}).context['page_obj']
+    assert page_obj.number == 2 and len(page_obj) == N_PER_PAGE, (
+        'Убедитесь, что страницы за пределами оценки числа публикаций '
+        'открываются.'
+    )
+    assert not page_obj.has_next()
@@ -0,0 +1,16 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db
+def test_feed_queries_use_indexes():
+    out = StringIO()
+    try:
+        call_command('check_feed_plans', stdout=out)
+    except CommandError as e:
+        raise AssertionError(
+            f'Убедитесь, что запросы лент используют индексы: {e}\n'
+            f'{out.getvalue()}'
+        )
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return {
+        '/feeds/rss/': 'application/rss+xml',
+        '/feeds/atom/': 'application/atom+xml',
+        f'/category/{published_category.slug}/rss/': 'application/rss+xml',
+        f'/category/{published_category.slug}/atom/': 'application/atom+xml',
+        f'/profile/{user.username}/rss/': 'application/rss+xml',
+        f'/profile/{user.username}/atom/': 'application/atom+xml',
+    }
+
+
+def test_feeds_follow_visibility_rules(
+        client, mixer, user, published_category, feed_urls):
+    def blend(title, **kwargs):
+        return mixer.blend(
+            'blog.Post', title=title, author=user,
+            category=published_category, **kwargs)
+
+    blend('Видимый пост', is_published=True)
+    blend('Скрытый пост', is_published=False)
+    for url, content_type in feed_urls.items():
+        response = client.get(url)
+        content = response.content.decode()
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith(content_type)
+        assert 'Видимый пост' in content and 'Скрытый пост' not in content, (
+            f'Убедитесь, что лента `{url}` выводит только посты, видимые '
+            'в ленте сайта.'
+        )
+
+
+def test_feeds_are_cached_with_validators(
+        client, mixer, post_with_published_location, feed_urls):
+    for url in feed_urls:
+        response = client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            cached = client.get(url)
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.content == response.content
+        assert cached['Last-Modified'] == response['Last-Modified']
+        assert not_modified.status_code == 304, (
+            'Убедитесь, что неизменившаяся лента отдаёт 304.'
+        )
+        assert len(queries) == 0, (
+            'Убедитесь, что повторный запрос ленты обслуживается из кэша.'
+        )
+
+    post = post_with_published_location
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get('/feeds/rss/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert 'Новый заголовок' in response.content.decode(), (
+        'Убедитесь, что кэш лент сбрасывается при изменении публикаций.'
+    )
+
+
+def test_feed_for_missing_category(client):
+    assert client.get('/category/missing/rss/').status_code == 404
@@ -0,0 +1,54 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+def test_loaddata_db_json():
+    from blog.models import Category, Post
+
+    out = StringIO()
+    call_command('loaddata', FIXTURE, stdout=out)
+    assert 'Installed 173 object(s)' in out.getvalue(), (
+        'Убедитесь, что фикстура `db.json` загружается командой `loaddata`.'
+    )
+    assert Post.objects.count() == 39
+    assert Category.objects.count() == 6
+
+
+def test_refresh_visibility_after_loaddata(client):
+    from blog.models import Post, Visibility
+
+    call_command('loaddata', FIXTURE, stdout=StringIO())
+    call_command('refresh_visibility', chunk_size=10, stdout=StringIO())
+    visible = Post.objects.filter(visibility=Visibility.VISIBLE)
+    assert visible.exists(), (
+        'Убедитесь, что команда `refresh_visibility` открывает в лентах '
+        'опубликованные посты, загруженные через loaddata.'
+    )
+    post = visible.select_related('category', 'author').first()
+    for url in ('/', f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/'):
+        assert post.title in client.get(url).content.decode('utf-8')
+    assert not Post.objects.filter(
+        visibility=Visibility.VISIBLE, is_published=False).exists()
+
+
+def test_search_after_loaddata(client):
+    from blog.models import Post, Visibility
+
+    call_command('loaddata', FIXTURE, stdout=StringIO())
+    call_command('refresh_visibility', stdout=StringIO())
+    post = Post.objects.filter(visibility=Visibility.VISIBLE).first()
+    word = post.title.split()[0]
+    response = client.get('/search/', {'q': word})
+    assert post in response.context['page_obj'], (
+        'Убедитесь, что посты, загруженные через loaddata, находятся поиском.'
+    )
@@ -0,0 +1,185 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import process_post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _photo(name='photo.jpg', size=(2000, 1000), color='teal'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@pytest.fixture
+def post_with_photo(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image=_photo())
+
+
+def test_renditions_scheduled_after_commit(
+        monkeypatch, django_capture_on_commit_callbacks, post_with_photo):
+    scheduled = []
+    monkeypatch.setattr(
+        'blog.signals.schedule_renditions', scheduled.append)
+    post = post_with_photo
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = _photo('other.jpg')
+        post.save()
+    assert scheduled == [post.id], (
+        'Убедитесь, что после сохранения нового изображения пост '
+        'передаётся фоновому пулу для подготовки уменьшенных копий.'
+    )
+    scheduled.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        process_post(post.id)
+        post.refresh_from_db()
+        post.save()
+    assert scheduled == [], (
+        'Убедитесь, что уже обработанное изображение не уменьшается повторно.'
+    )
+
+
+def test_renditions_in_feed_and_detail(client, post_with_photo):
+    post = post_with_photo
+    content = client.get('/').content.decode()
+    assert 'srcset' not in content and post.image.url in content
+
+    assert process_post(post.id)
+    post.refresh_from_db()
+    renditions = post.renditions
+    assert (renditions['card']['width'], renditions['card']['height']) == (
+        640, 320), 'Убедитесь, что копия для карточки вписана в 640 px.'
+    assert renditions['detail_webp']['width'] == 1280
+    for rendition in renditions.values():
+        assert post.image.storage.exists(rendition['path'])
+
+    for url in ('/', f'/posts/{post.id}/'):
+        content = client.get(url).content.decode()
+        assert f'{renditions["card"]["url"]} 640w' in content, (
+            'Убедитесь, что карточки и страница поста используют уменьшенные '
+            'копии изображения через `srcset`.'
+        )
+        assert renditions['detail_webp']['url'] in content
+        assert f'href="{post.image.url}"' in content
+
+    post.image = _photo('new.jpg', color='navy')
+    post.save()
+    assert post.renditions == {}, (
+        'Убедитесь, что копии старого изображения не выводятся для нового.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_build_image_renditions(
+        mixer, user, published_category, post_with_photo):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image=_photo('second.jpg', (300, 600)))
+    call_command(
+        'build_image_renditions', workers=2, chunk_size=1, stdout=StringIO())
+    posts = type(post_with_photo).objects.order_by('pk')
+    assert [post.renditions['card']['height'] for post in posts] == [
+        320, 600], (
+        'Убедитесь, что команда `build_image_renditions` готовит копии '
+        'для существующих изображений и не увеличивает маленькие.'
+    )
+
+
+def test_image_hash_dimensions_and_dedup(mixer, user, published_category):
+    first, second = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        image=(_photo(name) for name in ('a.JPG', 'b.jpg')))
+    assert len(first.image_hash) == 64 and first.image_meta == {
+        'width': 2000, 'height': 1000}, (
+        'Убедитесь, что при загрузке изображения сохраняются его SHA-256 '
+        'и размеры.'
+    )
+    digest = first.image_hash
+    assert first.image.name == second.image.name == (
+        f'post_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg'), (
+        'Убедитесь, что одинаковые изображения хранятся одним файлом '
+        'с именем по хэшу содержимого в каталогах по его первым символам.'
+    )
+    first.image = None
+    first.save()
+    assert (first.image_hash, first.image_meta) == ('', {})
+
+
+def test_backfill_image_hashes(
+        settings, mixer, user, published_category, post_with_photo):
+    legacy = settings.MEDIA_ROOT / 'post_images' / 'legacy.jpg'
+    legacy.write_bytes(_photo().read())
+    post = post_with_photo
+    type(post).objects.filter(pk=post.pk).update(
+        image='post_images/legacy.jpg', image_hash='', image_meta={})
+    call_command('backfill_image_hashes', stdout=StringIO())
+    updated = type(post).objects.get(pk=post.pk)
+    assert (updated.image.name, updated.image_hash, updated.image_meta) == (
+        post.image.name, post.image_hash, post.image_meta), (
+        'Убедитесь, что команда `backfill_image_hashes` заполняет хэш '
+        'и размеры и переносит файл под имя по хэшу.'
+    )
+
+
+def test_cleanup_media_orphans(settings, tmp_path, mixer, post_with_photo):
+    kept = post_with_photo
+    assert process_post(kept.id)
+    kept.refresh_from_db()
+    deleted = mixer.blend('blog.Post', image=_photo('gone.jpg', color='red'))
+    process_post(deleted.id)
+    deleted.refresh_from_db()
+    legacy = settings.MEDIA_ROOT / 'post_images' / 'legacy.jpg'
+    legacy.write_bytes(b'old')
+    orphans = {
+        deleted.image.name, 'post_images/legacy.jpg',
+        *(rendition['path'] for rendition in deleted.renditions.values())
+    }
+    deleted.delete()
+    storage = kept.image.storage
+
+    def existing():
+        return {
+            path.relative_to(settings.MEDIA_ROOT).as_posix()
+            for path in (settings.MEDIA_ROOT / 'post_images').rglob('*')
+            if path.is_file()
+        }
+
+    before = existing()
+    out = StringIO()
+    call_command('cleanup_media_orphans', dry_run=True, min_age=0, stdout=out)
+    assert existing() == before and all(
+        name in out.getvalue() for name in orphans), (
+        'Убедитесь, что `cleanup_media_orphans --dry-run` только выводит '
+        'файлы-сироты.'
+    )
+    call_command('cleanup_media_orphans', stdout=StringIO())
+    assert existing() == before, (
+        'Убедитесь, что свежие файлы не удаляются как сироты.'
+    )
+
+    quarantine = tmp_path / 'quarantine'
+    call_command(
+        'cleanup_media_orphans', min_age=0, quarantine=str(quarantine),
+        stdout=StringIO())
+    assert existing() == before - orphans, (
+        'Убедитесь, что `cleanup_media_orphans` убирает только файлы, '
+        'на которые не ссылаются публикации.'
+    )
+    assert (quarantine / 'post_images' / 'legacy.jpg').read_bytes() == b'old'
+    assert all(
+        storage.exists(rendition['path'])
+        for rendition in kept.renditions.values())
@@ -0,0 +1,77 @@
+import pytest
+from django.db import OperationalError
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_anonymous_index_is_cached_with_fresh_header(
+        client, user_client, mixer, user, post_with_published_location):
+    first = client.get('/')
+    assert 'page_obj' in first.context
+    cached = client.get('/')
+    assert 'page_obj' not in cached.context, (
+        'Убедитесь, что главная страница для анонимных читателей '
+        'отдаётся из кэша.'
+    )
+    content = cached.content.decode('utf-8')
+    assert post_with_published_location.title in content
+    assert '/auth/login/' in content
+    assert 'header-hole' not in content
+
+    logged = user_client.get('/')
+    assert 'page_obj' in logged.context
+    assert f'/profile/{user.username}/' in logged.content.decode('utf-8')
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        category=post_with_published_location.category,
+        pub_date=post_with_published_location.pub_date)
+    assert new_post.title in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что кэш страниц сбрасывается при создании публикации.'
+    )
+
+
+def test_stale_page_served_when_database_is_busy(
+        client, monkeypatch, post_with_published_location):
+    client.get('/')
+    post_with_published_location.save()
+
+    def locked():
+        raise OperationalError('database is locked')
+
+    monkeypatch.setattr('blog.views.get_base_queryset', locked)
+    response = client.get('/')
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode(
+        'utf-8')
+
+
+def test_feed_pages_served_without_database(
+        client, monkeypatch, user, post_with_published_location):
+    from django.contrib.auth import get_user_model
+    from blog.models import Category
+
+    def locked():
+        raise OperationalError('database is locked')
+
+    category_url = f'/category/{post_with_published_location.category.slug}/'
+    profile_url = f'/profile/{user.username}/'
+    client.get(category_url)
+    post_with_published_location.save()
+    profile = client.get(profile_url)
+
+    monkeypatch.setattr(Category.objects, 'get_queryset', locked)
+    monkeypatch.setattr(get_user_model().objects, 'get_queryset', locked)
+    response = client.get(category_url)
+    assert response.status_code == 200, (
+        'Убедитесь, что страница категории отдаётся из кэша, когда база '
+        'занята.'
+    )
+    assert post_with_published_location.title in response.content.decode(
+        'utf-8')
+    assert client.get(
+        profile_url, HTTP_IF_NONE_MATCH=profile['ETag']).status_code == 304, (
+        'Убедитесь, что ETag ленты проверяется без запросов к базе.'
+    )
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # одинаковые даты у пар публикаций проверяют порядок по id
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(1, N_PER_PAGE * 2 + 6)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=pub_dates)
+
+
+def _walk_keyset(client, url):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        page_obj = response.context['page_obj']
+        seen.extend(page_obj)
+        if not page_obj.has_next():
+            return seen, page_obj
+        cursor = page_obj.next_cursor()
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_keyset_pagination_walks_all_posts(
+        settings, client, feed_posts, user, published_category, url_name):
+    settings.FEED_PAGINATION = 'keyset'
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    seen, last_page = _walk_keyset(client, url)
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    assert [post.id for post in seen] == [post.id for post in expected], (
+        'Убедитесь, что при пагинации по курсору публикации выводятся '
+        'без пропусков и повторов в порядке «от новых к старым».'
+    )
+
+    response = client.get(url, {'cursor': last_page.previous_cursor()})
+    previous = [post.id for post in response.context['page_obj']]
+    assert previous == [post.id for post in expected[10:20]], (
+        'Убедитесь, что курсор на предыдущую страницу возвращает '
+        'предыдущие публикации.'
+    )
+
+
+def test_keyset_pagination_ignores_broken_cursor(
+        settings, client, feed_posts):
+    settings.FEED_PAGINATION = 'keyset'
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
+    assert not response.context['page_obj'].has_previous()
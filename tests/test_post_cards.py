@@ -0,0 +1,52 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_cached_post_card_follows_related_changes(
+        client, mixer, user, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+
+    post.category.title = 'Новое название категории'
+    post.category.save()
+    post.location.name = 'Новое место'
+    post.location.save()
+    user.username = 'renamed_author'
+    user.save()
+    mixer.blend('blog.Comment', post=post)
+
+    content = client.get('/').content.decode('utf-8')
+    for expected in ('Новое название категории', 'Новое место',
+                     '@renamed_author', 'Комментарии (1)'):
+        assert expected in content, (
+            'Убедитесь, что кэш карточки публикации сбрасывается при '
+            'изменении публикации, её категории, местоположения, автора '
+            'и числа комментариев.'
+        )
+
+
+def test_cached_post_body_keeps_comments_fresh(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    type(post).objects.filter(pk=post.pk).update(text='Текст без сигналов')
+    mixer.blend('blog.Comment', post=post, text='Свежий комментарий')
+    content = client.get(url).content.decode('utf-8')
+    assert 'Текст без сигналов' not in content, (
+        'Убедитесь, что тело статьи на странице поста берётся из кэша.'
+    )
+    assert 'Свежий комментарий' in content, (
+        'Убедитесь, что комментарии не попадают в кэш тела статьи.'
+    )
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    content = client.get(url).content.decode('utf-8')
+    assert 'Текст без сигналов' in content, (
+        'Убедитесь, что кэш тела статьи сбрасывается при изменении '
+        'публикации, категории или местоположения.'
+    )
@@ -0,0 +1,113 @@
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture(params=[10, 1000])
+def budget_data(request, mixer, user, published_category, published_location):
+    from blog.models import Post, Comment, Visibility
+    from blog.scheduling import publish_due_posts
+
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=timezone.now(),
+             author=user, category=published_category,
+             location=published_location, visibility=Visibility.VISIBLE)
+        for i in range(request.param)
+    )
+    post = Post.objects.order_by('-pub_date').first()
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=f'Комментарий {i}')
+        for i in range(N_PER_FIXTURE)
+    )
+    comment = post.comments.first()
+    publish_due_posts()
+    return post, comment
+
+
+def test_views_fit_query_budgets(
+        user, user_client, client, published_category, budget_data):
+    from blog.budgets import query_budget
+
+    post, comment = budget_data
+    post_url = f'/posts/{post.id}'
+    pages = (
+        ('blog:index', '/'),
+        ('blog:post_detail', f'{post_url}/'),
+        ('blog:category_posts', f'/category/{published_category.slug}/'),
+        ('blog:profile', f'/profile/{user.username}/'),
+        ('blog:create_post', '/posts/create/'),
+        ('blog:edit_post', f'{post_url}/edit/'),
+        ('blog:delete_post', f'{post_url}/delete/'),
+        ('blog:edit_comment', f'{post_url}/edit_comment/{comment.id}/'),
+        ('blog:delete_comment', f'{post_url}/delete_comment/{comment.id}/'),
+        ('blog:edit_profile', '/profile-edit/'),
+        ('pages:about', '/pages/about/'),
+        ('pages:rules', '/pages/rules/'),
+    )
+    for view_name, url in pages:
+        for page_client in (user_client, client):
+            with query_budget(view_name):
+                page_client.get(url)
+
+    post_data = {
+        'title': 'Заголовок', 'text': 'Текст', 'is_published': True,
+        'pub_date': '2020-01-01 10:00', 'category': published_category.id,
+    }
+    writes = (
+        ('blog:add_comment', f'{post_url}/comment/', {'text': 'Новый'}),
+        ('blog:edit_comment', f'{post_url}/edit_comment/{comment.id}/',
+         {'text': 'Изменённый'}),
+        ('blog:delete_comment', f'{post_url}/delete_comment/{comment.id}/',
+         {}),
+        ('blog:create_post', '/posts/create/', post_data),
+        ('blog:edit_post', f'{post_url}/edit/', post_data),
+        ('blog:edit_profile', '/profile-edit/',
+         {'username': user.username, 'email': 'budget@example.com'}),
+        ('blog:delete_post', f'{post_url}/delete/', {}),
+    )
+    for view_name, url, data in writes:
+        with query_budget(view_name):
+            response = user_client.post(url, data)
+        assert response.status_code == 302, view_name
+
+
+@pytest.mark.parametrize('view_name, suffix, expected', [
+    ('edit_post', 'edit/', 5),
+    ('delete_post', 'delete/', 3),
+    ('edit_comment', 'edit_comment/{comment}/', 3),
+    ('delete_comment', 'delete_comment/{comment}/', 3),
+])
+def test_action_views_resolve_object_once(
+        user_client, mixer, user, post_with_published_location,
+        view_name, suffix, expected):
+    from blog.budgets import TRANSACTION_STATEMENTS, capture_queries
+
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    url = f'/posts/{post.id}/{suffix.format(comment=comment.id)}'
+    user_client.get(url)  # планировщик публикаций — вне замера
+    with capture_queries() as queries:
+        response = user_client.get(url)
+    model = 'comment' if 'comment' in view_name else 'post'
+    object_queries = [
+        query for query in queries
+        if query['sql'].startswith(f'SELECT "blog_{model}"."id"')
+    ]
+    queries = [
+        query for query in queries
+        if not query['sql'].startswith(TRANSACTION_STATEMENTS)
+    ]
+    assert response.status_code == 200
+    assert len(object_queries) == 1, (
+        f'Убедитесь, что страница `{view_name}` выбирает объект один раз '
+        'и использует его для проверки прав, формы и перенаправления.'
+    )
+    assert len(queries) == expected, (
+        f'Убедитесь, что страница `{view_name}` выполняет {expected} '
+        f'SQL-запросов, а не {len(queries)}.'
+    )
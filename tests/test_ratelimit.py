@@ -0,0 +1,105 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def rate_limits(settings):
+    settings.RATE_LIMIT_ENABLE = True
+    settings.RATE_LIMITS = {
+        'blog:add_comment': {'requests': 1, 'period': 60, 'burst': 2},
+    }
+    settings.RATE_LIMIT_STORE = 'blog.ratelimit.LocalCounterStore'
+    return settings
+
+
+def test_comments_are_rate_limited(
+        user_client, post_with_published_location, rate_limits):
+    from blog.models import Comment
+
+    url = f'/posts/{post_with_published_location.id}/comment/'
+    for text in ('Первый', 'Второй'):
+        assert user_client.post(url, {'text': text}).status_code == 302
+    response = user_client.post(url, {'text': 'Третий'})
+    assert response.status_code == 429, (
+        'Убедитесь, что сверх лимита комментарий отклоняется с кодом 429.'
+    )
+    assert 0 < int(response['Retry-After']) <= 60
+    assert Comment.objects.count() == 2, (
+        'Убедитесь, что отклонённый запрос ничего не записывает в базу.'
+    )
+    assert user_client.get(
+        f'/posts/{post_with_published_location.id}/').status_code == 200
+
+
+@pytest.mark.parametrize('store, options', [
+    ('blog.ratelimit.FileCounterStore', 'path'),
+    ('blog.ratelimit.DatabaseCounterStore', None),
+])
+def test_counter_stores_refill_bucket(rate_limits, tmp_path, store, options):
+    from blog import ratelimit
+
+    rate_limits.RATE_LIMIT_STORE = store
+    rate_limits.RATE_LIMIT_STORE_OPTIONS = (
+        {options: tmp_path / 'counters.json'} if options else {})
+    counters = ratelimit.get_store()
+    waits = [
+        ratelimit.consume(
+            counters, 'key', requests=1, period=60, burst=2, now=now)
+        for now in (1000, 1000, 1000, 1061)
+    ]
+    assert waits == [0, 0, 60, 0], (
+        f'Убедитесь, что хранилище `{store}` атомарно считает маркеры '
+        'и корзина пополняется со временем.'
+    )
+
+
+@pytest.mark.parametrize('store, options', [
+    ('blog.ratelimit.LocalCounterStore', None),
+    ('blog.ratelimit.FileCounterStore', 'path'),
+])
+def test_concurrent_first_requests_share_bucket(
+        rate_limits, tmp_path, store, options):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from blog import ratelimit
+
+    rate_limits.RATE_LIMIT_STORE = store
+    rate_limits.RATE_LIMIT_STORE_OPTIONS = (
+        {options: tmp_path / 'counters.json'} if options else {})
+    counters = ratelimit.get_store()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        waits = list(executor.map(
+            lambda _: ratelimit.consume(
+                counters, 'key', requests=1, period=60, burst=2, now=1000),
+            range(16)
+        ))
+    assert waits.count(0) == 2, (
+        'Убедитесь, что одновременные запросы к новой корзине забирают '
+        'не больше burst маркеров.'
+    )
+    assert all(wait <= 60 for wait in waits), (
+        f'Убедитесь, что `{store}` сдвигает корзину одним атомарным шагом: '
+        f'ожидание не может превышать период, получено {max(waits)}.'
+    )
+
+
+def test_rejected_ip_refunds_user_token(
+        client, mixer, post_with_published_location, rate_limits):
+    rate_limits.RATE_LIMITS = {
+        'blog:add_comment': {'requests': 1, 'period': 60, 'burst': 1},
+    }
+    url = f'/posts/{post_with_published_location.id}/comment/'
+    first, second = mixer.cycle(2).blend('auth.User')
+    client.force_login(first)
+    assert client.post(url, {'text': 'Первый'}).status_code == 302
+    client.force_login(second)
+    assert client.post(url, {'text': 'Второй'}).status_code == 429
+    response = client.post(
+        url, {'text': 'Второй'}, REMOTE_ADDR='10.0.0.2')
+    assert response.status_code == 302, (
+        'Убедитесь, что маркер пользователя возвращается, если запрос '
+        'отклонён по лимиту IP-адреса.'
+    )
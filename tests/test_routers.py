@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.routers import PIN_COOKIE, ReplicaRouter, _pinned, replica_reads
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica1', 'replica2']
+    return settings.DATABASE_REPLICAS
+
+
+def test_router_reads_from_replicas_only_in_marked_views(replicas):
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == 'default'
+    with replica_reads():
+        assert router.db_for_read(Post) in replicas
+        assert router.db_for_write(Post) == 'default'
+        token = _pinned.set(True)
+        try:
+            assert router.db_for_read(Post) == 'default', (
+                'Убедитесь, что после записи чтение закрепляется за '
+                'основной базой.'
+            )
+        finally:
+            _pinned.reset(token)
+    assert not router.allow_migrate('replica1', 'blog')
+    assert router.allow_migrate('default', 'blog')
+
+
+@pytest.mark.django_db
+def test_write_pins_user_to_primary(
+        replicas, user_client, post_with_published_location):
+    response = user_client.post(
+        f'/posts/{post_with_published_location.id}/comment/',
+        {'text': 'Комментарий'})
+    assert float(response.cookies[PIN_COOKIE].value) > time.time()
+    assert user_client.get('/').status_code == 200
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+def test_marked_view_reads_from_replica(
+        settings, client, post_with_published_location):
+    settings.DATABASE_REPLICAS = ['replica1']
+    # первый запрос публикует отложенные посты через основную базу
+    client.get('/')
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica1']) as replica:
+        response = client.get(
+            f'/category/{post_with_published_location.category.slug}/')
+    assert post_with_published_location.title in response.content.decode(
+        'utf-8')
+    assert any('blog_post' in query['sql'] for query in replica), (
+        'Убедитесь, что лента читает публикации с реплики.'
+    )
+    assert not any('blog_post' in query['sql'] for query in primary), (
+        'Убедитесь, что лента не читает публикации из основной базы.'
+    )
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+def test_replica_reads_are_not_cached(
+        settings, client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/category/{post.category.slug}/'
+    settings.DATABASE_REPLICAS = ['replica1']
+    client.get(url)
+    client.get(f'/posts/{post.id}/')
+    # запись без сигналов: версии и поколения в кэше остаются прежними
+    type(post).objects.filter(pk=post.pk).update(
+        title='Новый заголовок', text='Новый текст')
+    settings.DATABASE_REPLICAS = []
+    assert 'Новый заголовок' in client.get(url).content.decode('utf-8'), (
+        'Убедитесь, что страницы и карточки, прочитанные с реплики, '
+        'не сохраняются в кэш.'
+    )
+    assert 'Новый текст' in client.get(
+        f'/posts/{post.id}/').content.decode('utf-8')
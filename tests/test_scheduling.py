@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1))
+
+
+def test_scheduled_post_opens_when_due(client, scheduled_post):
+    from blog.models import Visibility
+    from blog.scheduling import NEXT_PUBLICATION_KEY, publish_due_posts
+
+    assert scheduled_post.visibility == Visibility.SCHEDULED
+    published, next_at = publish_due_posts()
+    assert (published, next_at) == (0, scheduled_post.pub_date)
+    assert scheduled_post.title not in client.get('/').content.decode()
+
+    # время публикации наступило: первый же запрос откроет пост
+    type(scheduled_post).objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    cache.set(NEXT_PUBLICATION_KEY, time.time() - 1)
+    assert scheduled_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что отложенная публикация появляется в ленте, '
+        'когда наступает её время.'
+    )
+
+
+def test_category_flag_is_materialized(
+        user_client, post_with_published_location):
+    from blog.models import Visibility
+
+    post = post_with_published_location
+    post.category.is_published = False
+    post.category.save()
+    post.refresh_from_db()
+    assert post.visibility == Visibility.HIDDEN
+
+    post.category.is_published = True
+    post.category.save()
+    post.refresh_from_db()
+    assert post.visibility == Visibility.VISIBLE
+
+
+@pytest.mark.django_db(transaction=True)
+def test_publication_on_read_retries_locked_database(
+        settings, monkeypatch, client, scheduled_post):
+    from django.db import OperationalError
+    from django.db.models import QuerySet
+    from blog import sqlite
+
+    settings.SQLITE_WRITE_BACKOFF = 0
+    type(scheduled_post).objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    cache.clear()
+    update = QuerySet.update
+    failures = []
+
+    def locked_once(self, **kwargs):
+        if not failures:
+            failures.append(kwargs)
+            raise OperationalError('database is locked')
+        return update(self, **kwargs)
+
+    monkeypatch.setattr(QuerySet, 'update', locked_once)
+    monkeypatch.setattr(sqlite.time, 'sleep', lambda delay: None)
+    response = client.get('/')
+    assert response.status_code == 200 and failures, (
+        'Убедитесь, что запрос на чтение открывает отложенные посты через '
+        '`serialized_write` и повторяет запись, если база занята.'
+    )
+    assert scheduled_post.title in response.content.decode('utf-8')
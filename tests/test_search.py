@@ -0,0 +1,106 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_finds_visible_posts(
+        mixer, client, user, published_category):
+    def blend(**kwargs):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, **kwargs)
+
+    in_title = blend(title='Ежики в тумане', text='Прогулка')
+    in_text = blend(title='Заметка', text='Видел ежика у реки')
+    blend(title='Другое', text='Совсем о другом')
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, title='Ежики тайком', text='')
+
+    assert _found(client, 'ежик') == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит опубликованные посты по префиксу слова '
+        'без учёта регистра, а совпадения в заголовке '
+        'стоят выше.'
+    )
+    assert _found(client, 'ежик*" (') == [in_title.id, in_text.id], (
+        'Убедитесь, что операторы FTS5 в запросе не приводят к ошибке.'
+    )
+
+    in_text.title, in_text.text = 'Заметка', 'Про реку'
+    in_text.save()
+    in_title.delete()
+    assert _found(client, 'ежик') == [], (
+        'Убедитесь, что индекс поиска обновляется при изменении и удалении '
+        'публикаций.'
+    )
+
+
+def test_search_pagination_keeps_query(
+        mixer, client, user, published_category):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Поиск')
+    response = client.get('/search/', {'q': 'поиск'})
+    assert 'href="?q=%D0%BF%D0%BE%D0%B8%D1%81%D0%BA&amp;page=2"' in (
+        response.content.decode()
+    ), 'Убедитесь, что ссылки пагинатора поиска сохраняют запрос.'
+    assert len(_found(client, 'поиск', page=2)) == 1
+
+
+def test_rebuild_search_index(mixer, client, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Переиндексация')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert _found(client, 'переиндексация') == []
+    call_command('rebuild_search_index', chunk_size=1, stdout=StringIO())
+    assert _found(client, 'переиндексация') == [post.id]
+
+
+def test_rebuild_search_index_keeps_index_available(
+        monkeypatch, mixer, client, user, published_category):
+    from blog.management.commands import rebuild_search_index
+
+    posts = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Перестройка')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, text) "
+            "VALUES (999, 'Перестройка', '')")
+    found = []
+    replace_range = rebuild_search_index.replace_range
+
+    def replace_and_search(*args):
+        replace_range(*args)
+        found.append(sorted(_found(client, 'перестройка')))
+
+    monkeypatch.setattr(
+        rebuild_search_index, 'replace_range', replace_and_search)
+    call_command('rebuild_search_index', chunk_size=1, stdout=StringIO())
+    ids = sorted(post.id for post in posts)
+    assert found and all(result == ids for result in found), (
+        'Убедитесь, что во время перестройки индекса поиск продолжает '
+        'находить публикации.'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT rowid FROM blog_post_fts ORDER BY rowid')
+        assert [row[0] for row in cursor.fetchall()] == ids, (
+            'Убедитесь, что перестройка убирает из индекса строки '
+            'несуществующих публикаций.'
+        )
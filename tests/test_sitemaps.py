@@ -0,0 +1,78 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def sitemap_settings(settings, tmp_path):
+    settings.SITEMAP_SHARD_SIZE = 2
+    settings.SITEMAP_ROOT = tmp_path
+    return settings
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, sitemap_settings):
+    return mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, location=None
+    )
+
+
+def test_sitemap_index_lists_shards(client, posts, published_category):
+    content = client.get('/sitemap.xml').content.decode()
+    for shard in range(3):
+        assert f'/sitemaps/posts-{shard}.xml' in content, (
+            'Убедитесь, что индекс карты сайта перечисляет шарды публикаций '
+            'по диапазонам id.'
+        )
+    assert '/sitemaps/authors-0.xml' in content
+    assert '/sitemaps/categories.xml' in content
+    categories = client.get('/sitemaps/categories.xml').content.decode()
+    assert f'/category/{published_category.slug}/' in categories
+
+
+def test_sitemap_shards_follow_id_ranges(client, posts, sitemap_settings):
+    hidden = posts[0]
+    hidden.is_published = False
+    hidden.save()
+    content = client.get('/sitemaps/posts-0.xml').content.decode()
+    assert f'/posts/{posts[1].pk}/' in content
+    assert f'/posts/{hidden.pk}/' not in content, (
+        'Убедитесь, что в карту сайта попадают только видимые публикации.'
+    )
+    assert f'/posts/{posts[2].pk}/' not in content
+    assert client.get('/sitemaps/posts-9.xml').status_code == 404
+    assert client.get('/sitemaps/other-0.xml').status_code == 404
+
+
+def test_closed_shards_are_served_from_disk(client, posts, sitemap_settings):
+    call_command('build_sitemaps')
+    root = sitemap_settings.SITEMAP_ROOT
+    assert sorted(path.name for path in root.iterdir()) == [
+        'posts-0.xml', 'posts-1.xml'], (
+        'Убедитесь, что команда `build_sitemaps` записывает на диск только '
+        'закрытые шарды.'
+    )
+    client.get('/sitemap.xml')  # планировщик публикаций — вне замера
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/sitemaps/posts-0.xml')
+        b''.join(response.streaming_content)
+    assert len(queries) == 1, (
+        'Убедитесь, что закрытый шард отдаётся с диска без выборки постов.'
+    )
+
+    posts[4].title = 'Изменённый пост'
+    posts[4].save()
+    assert (root / 'posts-0.xml').exists(), (
+        'Убедитесь, что изменение поста из последнего шарда не сбрасывает '
+        'закрытые шарды.'
+    )
+    posts[0].save()
+    assert not (root / 'posts-0.xml').exists(), (
+        'Убедитесь, что изменение поста сбрасывает файл его шарда.'
+    )
@@ -0,0 +1,107 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    from blog import sqlite
+
+    delays = []
+    monkeypatch.setattr(sqlite.time, 'sleep', delays.append)
+    return delays
+
+
+def _failing(times, message='database is locked'):
+    calls = []
+
+    def write():
+        calls.append(len(calls))
+        if len(calls) <= times:
+            raise OperationalError(message)
+        return 'ok'
+
+    return write, calls
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_write_retries_with_backoff(settings, sleeps):
+    from blog.sqlite import serialized_write
+
+    settings.SQLITE_WRITE_RETRIES = 5
+    settings.SQLITE_WRITE_BACKOFF = 0.05
+    write, calls = _failing(3)
+    assert serialized_write(write) == 'ok'
+    assert len(calls) == 4, (
+        'Убедитесь, что `serialized_write` повторяет запись, пока база '
+        'заблокирована.'
+    )
+    assert sleeps == [0.05, 0.1, 0.2], (
+        'Убедитесь, что пауза между повторами записи растёт вдвое.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_write_gives_up(settings, sleeps):
+    from blog.sqlite import serialized_write
+
+    settings.SQLITE_WRITE_RETRIES = 2
+    write, calls = _failing(10)
+    with pytest.raises(OperationalError):
+        serialized_write(write)
+    assert len(calls) == 3, (
+        'Убедитесь, что после последней попытки `serialized_write` '
+        'передаёт ошибку вызывающему коду.'
+    )
+    assert len(sleeps) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_write_does_not_retry_other_errors(sleeps):
+    from blog.sqlite import serialized_write
+
+    write, calls = _failing(1, 'no such table: blog_post')
+    with pytest.raises(OperationalError):
+        serialized_write(write)
+    assert len(calls) == 1 and not sleeps
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_on_new_connection(settings, tmp_path):
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+
+    settings.SQLITE_PRAGMAS = {'journal_mode': 'wal', 'busy_timeout': 5000}
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='pragmas'
+    )
+    try:
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+    finally:
+        wrapper.close()
+    assert (journal_mode, busy_timeout) == ('wal', 5000), (
+        'Убедитесь, что новое соединение получает прагмы из SQLITE_PRAGMAS.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_comment_writes_cleans_up():
+    from django.contrib.auth import get_user_model
+    from blog.models import Category, Comment, Post
+
+    call_command(
+        'bench_comment_writes', seconds=0.2, writers=1, readers=1,
+        stdout=StringIO()
+    )
+    assert not get_user_model().objects.exists()
+    assert not Category.objects.exists()
+    assert not Post.all_objects.exists()
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что бенчмарк удаляет созданные им объекты.'
+    )